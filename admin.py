@@ -1,6 +1,10 @@
+import os
+from functools import partial
 import streamlit as st
 import pandas as pd
-from database import get_assessment_results
+from database import load_results_frame, rollup_metrics, get_data_version
+from analyzer import get_strategy_name, advice_breakdown
+from export import EXPORT_FORMATS, start_export, read_export
 import plotly.express as px
 
 # Page configuration
@@ -10,15 +14,147 @@ st.set_page_config(
     layout="wide"
 )
 
+# Dashboard caching: the data version is re-checked every few seconds, and
+# everything else is cached per data version, so reruns with unchanged data
+# are served from memory while new submissions still show up quickly
+VERSION_CHECK_TTL_SECONDS = 5
+DATA_CACHE_TTL_SECONDS = 600
+
+@st.cache_data(ttl=VERSION_CHECK_TTL_SECONDS, show_spinner=False)
+def cached_data_version():
+    return get_data_version()
+
+@st.cache_data(ttl=DATA_CACHE_TTL_SECONDS, max_entries=4, show_spinner=False)
+def cached_metrics(data_version):
+    return rollup_metrics()
+
+@st.cache_data(ttl=DATA_CACHE_TTL_SECONDS, max_entries=4, show_spinner=False)
+def cached_recent_results(data_version):
+    # Load the newest results straight into a DataFrame
+    df = load_results_frame(limit=100)
+    return df, df.to_csv(index=False).encode('utf-8')
+
+@st.cache_data(ttl=DATA_CACHE_TTL_SECONDS, max_entries=4, show_spinner=False)
+def cached_advice(data_version):
+    # Matchup advice given, from the dominant strategy counts and the analyzer's matchup index
+    metrics = cached_metrics(data_version)
+    return pd.DataFrame(
+        advice_breakdown(metrics['strategy_counts']),
+        columns=['Strategy', 'Ex-Partner Type', 'Risk', 'Tip', 'Times Given']
+    ).sort_values('Times Given', ascending=False, kind='stable')
+
+@st.cache_resource(ttl=DATA_CACHE_TTL_SECONDS, max_entries=4, show_spinner=False)
+def cached_figures(data_version):
+    """Build the dashboard charts once per data version."""
+    metrics = cached_metrics(data_version)
+    figures = {}
+    
+    # Distribution of overall scores, binned in the database
+    histogram = metrics['score_histogram']
+    fig1 = px.bar(
+        x=[(start + end) / 2 for start, end, _ in histogram],
+        y=[count for _, _, count in histogram],
+        title="Distribution of Overall Scores",
+        labels={'x': "Overall Score", 'y': "count"},
+        color_discrete_sequence=["#4a90e2"]
+    )
+    if histogram:
+        fig1.update_traces(width=histogram[0][1] - histogram[0][0])
+    fig1.update_layout(bargap=0)
+    figures['scores'] = fig1
+    
+    # Distribution of dominant strategies
+    if metrics['strategy_counts']:
+        figures['strategies'] = px.bar(
+            x=[get_strategy_name(strategy) for strategy, _ in metrics['strategy_counts']],
+            y=[count for _, count in metrics['strategy_counts']],
+            labels={'x': 'Dominant Strategy', 'y': 'Count'},
+            title="Dominant Strategy Distribution",
+            color_discrete_sequence=["#4a90e2"]
+        )
+    
+    # Average category scores
+    categories = ['legal_score', 'emotional_score', 'financial_score', 'children_score', 'recovery_score']
+    category_labels = {
+        'legal_score': 'Legal',
+        'emotional_score': 'Emotional',
+        'financial_score': 'Financial',
+        'children_score': 'Children',
+        'recovery_score': 'Recovery'
+    }
+    
+    category_means = {
+        category_labels[col]: metrics['category_means'][col] if metrics['category_means'][col] is not None else float('nan')
+        for col in categories
+    }
+    
+    figures['categories'] = px.bar(
+        x=list(category_means.keys()),
+        y=list(category_means.values()),
+        labels={'x': 'Category', 'y': 'Average Score'},
+        title="Average Scores by Category",
+        color=list(category_means.values()),
+        color_continuous_scale=['red', 'yellow', 'green'],
+        range_color=[0, 100]
+    )
+    
+    # Distribution by divorce stage
+    if metrics['stage_counts']:
+        stage_counts = pd.DataFrame(metrics['stage_counts'], columns=['Divorce Stage', 'Count'])
+        
+        figures['stages'] = px.pie(
+            stage_counts,
+            values='Count',
+            names='Divorce Stage',
+            title="Assessment Distribution by Divorce Stage",
+            hole=0.4
+        )
+    
+    return figures
+
+@st.fragment(run_every=1)
+def export_progress():
+    """Poll the running export without rerunning the whole dashboard."""
+    job = st.session_state.get('export_job')
+    if job is None or not job.is_alive():
+        # Rerun the page once so the result is shown and polling stops
+        st.rerun()
+    total = job.total_rows if job.total_rows is not None else '?'
+    st.progress(job.progress, text=f"Exporting... {job.rows_written} of {total} rows")
+
+def export_status():
+    """Show the background export: progress while it runs, then its result."""
+    job = st.session_state.get('export_job')
+    if job is None:
+        return
+    
+    if job.is_alive():
+        export_progress()
+    elif job.status == 'failed':
+        st.error(f"Export failed: {job.error}")
+    elif job.status == 'done':
+        if os.path.exists(job.path):
+            # Read only when the button is clicked, not on every rerun
+            st.download_button(
+                f"Download Export ({job.rows_written} rows)",
+                partial(read_export, job.path),
+                os.path.basename(job.path),
+                "application/octet-stream",
+                on_click="ignore",
+                key='download-export'
+            )
+        else:
+            st.info("The export has expired. Start a new one to download the data.")
+
 # Admin password protection
 def check_password():
     """Returns `True` if the user had the correct password."""
     if "password_correct" not in st.session_state:
         st.session_state.password_correct = False
-
+    
     if st.session_state.password_correct:
         return True
-
+    
     st.title("Divorce Assessment Admin Panel")
     password = st.text_input("Enter password", type="password")
     
@@ -35,97 +171,42 @@ if check_password():
     st.title("Divorce Assessment Admin Dashboard")
     st.markdown("View and analyze all assessment results")
     
-    # Get all results from database
-    results = get_assessment_results()
+    # Metrics come from the incrementally maintained rollup table
+    data_version = cached_data_version()
+    metrics = cached_metrics(data_version)
     
-    if not results:
+    if metrics['total'] == 0:
         st.info("No assessment results found in the database.")
     else:
-        # Convert results to DataFrame for easier analysis
-        data = []
-        for result in results:
-            data.append({
-                'id': result.id,
-                'email': result.email,
-                'age': result.age,
-                'divorce_stage': result.divorce_stage,
-                'overall_score': result.overall_score,
-                'legal_score': result.legal_score,
-                'emotional_score': result.emotional_score,
-                'financial_score': result.financial_score,
-                'children_score': result.children_score,
-                'recovery_score': result.recovery_score,
-                'created_at': result.created_at
-            })
-        
-        df = pd.DataFrame(data)
-        
         # Dashboard metrics
         st.subheader("Dashboard Metrics")
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Total Assessments", len(df))
+            st.metric("Total Assessments", metrics['total'])
         with col2:
-            st.metric("Average Overall Score", f"{df['overall_score'].mean():.1f}")
+            st.metric("Average Overall Score", f"{metrics['average_overall_score']:.1f}")
         with col3:
-            st.metric("Recent Submissions", len(df[df['created_at'] > pd.Timestamp.now() - pd.Timedelta(days=7)]))
+            st.metric("Recent Submissions", metrics['recent_count'])
         
         # Charts and visualizations
         st.subheader("Assessment Score Distribution")
         
-        # Distribution of overall scores
-        fig1 = px.histogram(
-            df,
-            x="overall_score",
-            nbins=20,
-            title="Distribution of Overall Scores",
-            labels={"overall_score": "Overall Score"},
-            color_discrete_sequence=["#4a90e2"]
-        )
-        st.plotly_chart(fig1, use_container_width=True)
-        
-        # Average category scores
-        categories = ['legal_score', 'emotional_score', 'financial_score', 'children_score', 'recovery_score']
-        category_labels = {
-            'legal_score': 'Legal',
-            'emotional_score': 'Emotional',
-            'financial_score': 'Financial',
-            'children_score': 'Children',
-            'recovery_score': 'Recovery'
-        }
+        figures = cached_figures(data_version)
+        for name in ('scores', 'strategies', 'categories', 'stages'):
+            if name in figures:
+                st.plotly_chart(figures[name], use_container_width=True)
         
-        category_means = {category_labels[col]: df[col].mean() for col in categories}
-        
-        fig2 = px.bar(
-            x=list(category_means.keys()),
-            y=list(category_means.values()),
-            labels={'x': 'Category', 'y': 'Average Score'},
-            title="Average Scores by Category",
-            color=list(category_means.values()),
-            color_continuous_scale=['red', 'yellow', 'green'],
-            range_color=[0, 100]
-        )
-        st.plotly_chart(fig2, use_container_width=True)
-        
-        # Distribution by divorce stage
-        if df['divorce_stage'].notna().any():
-            stage_counts = df['divorce_stage'].value_counts().reset_index()
-            stage_counts.columns = ['Divorce Stage', 'Count']
-            
-            fig3 = px.pie(
-                stage_counts,
-                values='Count',
-                names='Divorce Stage',
-                title="Assessment Distribution by Divorce Stage",
-                hole=0.4
-            )
-            st.plotly_chart(fig3, use_container_width=True)
+        # Matchup advice included in the reports sent so far
+        st.subheader("Matchup Advice Given")
+        st.dataframe(cached_advice(data_version), hide_index=True)
         
         # Raw data table (with option to download)
         st.subheader("Raw Assessment Data")
+        st.caption("Showing the 100 most recent assessments")
+        
+        df, csv = cached_recent_results(data_version)
         
         # Create downloadable CSV
-        csv = df.to_csv(index=False).encode('utf-8')
         st.download_button(
             "Download Data as CSV",
             csv,
@@ -136,3 +217,19 @@ if check_password():
         
         # Display the data table
         st.dataframe(df)
+        
+        # Full-table export runs in the background and writes to a file,
+        # so it neither blocks the dashboard nor loads the table into memory
+        st.subheader("Export All Assessments")
+        col1, col2 = st.columns(2)
+        with col1:
+            export_format = st.selectbox("Format", EXPORT_FORMATS, key='export-format')
+        with col2:
+            include_responses = st.checkbox("Include individual responses", key='export-responses')
+        
+        job = st.session_state.get('export_job')
+        running = job is not None and job.is_alive()
+        if st.button("Start Export", disabled=running, key='start-export'):
+            st.session_state.export_job = start_export(export_format, include_responses)
+        
+        export_status()
@@ -1,4 +1,40 @@
-import questionnaire
+import os
+from questionnaire import REGISTRY
+from functools import lru_cache
+from types import MappingProxyType
+
+# Frozen mapping: question ID -> option text -> strategy code
+SCORING_TABLE = REGISTRY.option_strategies
+STRATEGY_CODES = ('G', 'B', 'C', 'H')
+TOTAL_QUESTIONS = len(SCORING_TABLE)  # Total number of strategy questions
+
+# Entries per cache for feedback and suggestions (keyed on the score
+# signature) and report fragments (utils, keyed on the values rendered);
+# with ten questions there are at most ~1,000 distinct signatures
+FRAGMENT_CACHE_SIZE = int(os.environ.get("FRAGMENT_CACHE_SIZE", "1024"))
+
+def _build_matchup_index():
+    """
+    Group matchup advice by the respondent's strategy, with ex-partner names
+    already resolved, so suggestions never scan the full advice table.
+    """
+    index = {code: [] for code in REGISTRY.strategies}
+    for advice in REGISTRY.matchups:
+        index.setdefault(advice.your, []).append(MappingProxyType({
+            'ex_type': ', '.join([REGISTRY.strategy_name(ex) for ex in advice.ex]),
+            'risk': advice.risk,
+            'tip': advice.tip
+        }))
+    return MappingProxyType({code: tuple(suggestions) for code, suggestions in index.items()})
+
+# Frozen mapping: strategy code -> read-only matchup suggestions, in advice order
+MATCHUP_INDEX = _build_matchup_index()
+
+# Question ID -> option text -> position in SCORING_TABLE, for batch encoding
+_OPTION_INDEXES = MappingProxyType({
+    question_id: MappingProxyType({option: index for index, option in enumerate(option_strategies)})
+    for question_id, option_strategies in SCORING_TABLE.items()
+})
 
 def calculate_scores(responses):
     """
@@ -14,31 +50,17 @@ def calculate_scores(responses):
     }
     
     # Count strategies from responses
-    for q_id in range(1, 11):
-        question_id = f'question_{q_id}'
-        if question_id in responses:
-            # Get the chosen option (0-based index)
-            try:
-                # For single-choice questions, we get the index of the selected option
-                sections = questionnaire.get_questionnaire_sections()
-                questions = sections[0]['questions']
-                
-                # Find the matching question
-                for question in questions:
-                    if question['id'] == question_id:
-                        # Get the options and find the index of the selected answer
-                        options = question['options']
-                        selected_answer = responses[question_id]
-                        
-                        # Find the index of the selected answer
-                        if selected_answer in options:
-                            selected_index = options.index(selected_answer)
-                            # Get the corresponding strategy value
-                            if 'strategy_values' in question and selected_index < len(question['strategy_values']):
-                                strategy = question['strategy_values'][selected_index]
-                                strategy_counts[strategy] += 1
-            except Exception as e:
-                print(f"Error processing question {question_id}: {e}")
+    for question_id, option_strategies in SCORING_TABLE.items():
+        selected_answer = responses.get(question_id)
+        if selected_answer is None:
+            continue
+        try:
+            strategy = option_strategies.get(selected_answer)
+        except TypeError as e:
+            print(f"Error processing question {question_id}: {e}")
+            continue
+        if strategy is not None:
+            strategy_counts[strategy] += 1
     
     # Determine dominant strategy
     if sum(strategy_counts.values()) > 0:
@@ -62,49 +84,131 @@ def calculate_scores(responses):
     }
     
     # Get percentage represented by dominant strategy (for overall score)
-    total_questions = 10  # Total number of strategy questions
-    if total_questions > 0 and top_count > 0:
-        scores['overall'] = round((top_count / total_questions) * 100)
+    if TOTAL_QUESTIONS > 0 and top_count > 0:
+        scores['overall'] = round((top_count / TOTAL_QUESTIONS) * 100)
     else:
         scores['overall'] = 0
     
     return scores
 
+def calculate_scores_batch(responses_iterable):
+    """
+    Score many stored submissions at once.
+    
+    Encodes the responses into a (submissions x questions) matrix of option
+    indexes and computes counts, dominant strategy, ties and overall score
+    with array operations. Results match calculate_scores exactly.
+    
+    Args:
+        responses_iterable: Iterable of responses dicts (e.g. AssessmentResult.responses)
+    
+    Returns:
+        List of score dictionaries, in input order
+    """
+    # numpy is only needed when re-scoring archives, not on the submit path
+    import numpy as np
+    
+    question_ids = tuple(SCORING_TABLE)
+    option_lookups = [_OPTION_INDEXES[question_id] for question_id in question_ids]
+    
+    # Encode answers as option indexes; -1 marks missing or unknown answers
+    rows = []
+    for responses in responses_iterable:
+        responses = responses or {}
+        row = []
+        for question_id, option_index in zip(question_ids, option_lookups):
+            try:
+                row.append(option_index.get(responses.get(question_id), -1))
+            except TypeError:
+                row.append(-1)
+        rows.append(row)
+    
+    if not rows:
+        return []
+    
+    encoded = np.array(rows, dtype=np.int8).reshape(len(rows), len(question_ids))
+    
+    # Map (question, option index) to a strategy index; the extra last column
+    # catches -1 so unanswered questions fall through to "no strategy"
+    width = max((len(lookup) for lookup in option_lookups), default=0) + 1
+    strategy_matrix = np.full((len(question_ids), width), -1, dtype=np.int8)
+    for q_index, question_id in enumerate(question_ids):
+        for option_position, strategy in enumerate(SCORING_TABLE[question_id].values()):
+            strategy_matrix[q_index, option_position] = STRATEGY_CODES.index(strategy)
+    strategies = strategy_matrix[np.arange(len(question_ids)), encoded]
+    
+    counts = np.stack(
+        [(strategies == index).sum(axis=1) for index in range(len(STRATEGY_CODES))],
+        axis=1
+    )
+    
+    # argmax returns the first maximum, matching max() over the ordered dict
+    dominant = counts.argmax(axis=1)
+    dominant[counts.sum(axis=1) == 0] = STRATEGY_CODES.index('B')
+    top_counts = counts[np.arange(len(rows)), dominant]
+    tie_mask = counts == top_counts[:, None]
+    has_tie = tie_mask.sum(axis=1) > 1
+    
+    # Precompute overall scores so rounding is identical to calculate_scores
+    overall_by_count = [
+        round((count / TOTAL_QUESTIONS) * 100) if count > 0 else 0
+        for count in range(TOTAL_QUESTIONS + 1)
+    ]
+    
+    results = []
+    for counts_row, dominant_index, top_count, ties_row, tie in zip(
+        counts.tolist(), dominant.tolist(), top_counts.tolist(), tie_mask.tolist(), has_tie.tolist()
+    ):
+        results.append({
+            'strategy_counts': dict(zip(STRATEGY_CODES, counts_row)),
+            'dominant_strategy': STRATEGY_CODES[dominant_index],
+            'has_tie': tie,
+            'tied_strategies': [s for s, tied in zip(STRATEGY_CODES, ties_row) if tied] if tie else [],
+            'overall': overall_by_count[top_count]
+        })
+    
+    return results
+
+def score_signature(scores):
+    """
+    Reduce scores to the hashable key that feedback and suggestions depend on.
+    
+    Returns:
+        Tuple of (dominant strategy, has tie, tied strategies, strategy count items)
+    """
+    return (
+        scores['dominant_strategy'],
+        scores['has_tie'],
+        tuple(scores['tied_strategies']),
+        tuple(scores['strategy_counts'].items())
+    )
+
+def _scores_from_signature(signature):
+    dominant_strategy, has_tie, tied_strategies, count_items = signature
+    return {
+        'dominant_strategy': dominant_strategy,
+        'has_tie': has_tie,
+        'tied_strategies': list(tied_strategies),
+        'strategy_counts': dict(count_items)
+    }
+
 def generate_feedback(scores, responses):
-    """Generate personalized feedback based on dominant strategy."""
+    """
+    Generate personalized feedback based on dominant strategy.
+    
+    Feedback depends only on the score signature, so it is served from a
+    bounded cache; each call gets its own dict of the shared strings.
+    """
+    return dict(_cached_feedback(score_signature(scores)))
+
+@lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def _cached_feedback(signature):
+    return tuple(_build_feedback(_scores_from_signature(signature)).items())
+
+def _build_feedback(scores):
     feedback = {}
     
-    # Get strategy information from the questionnaire module
-    try:
-        strategy_info = questionnaire.strategy_information
-    except:
-        # Fallback if not available
-        strategy_info = {
-            'G': {
-                'label': 'The People‑Pleaser',
-                'strength': 'You lower tension and keep dialogue open, which can speed practical resolutions.',
-                'watch_out': 'You risk giving up long-term security. Establish non-negotiable must-haves and get professional advice.',
-                'description': 'Avoids conflict and gives too much to keep the peace—often at their own expense.'
-            },
-            'B': {
-                'label': 'The Diplomat',
-                'strength': 'You protect yourself while staying child-focused. Courts and mediators respect this stance.',
-                'watch_out': 'A highly aggressive ex can see cooperation as weakness. Set hard deadlines and document every exchange.',
-                'description': 'Firm, fair, and child-focused—seeks balance and practical solutions.'
-            },
-            'C': {
-                'label': 'The Challenger',
-                'strength': 'You secure resources and discourage exploitation.',
-                'watch_out': 'Winning every point may damage future co-parenting. Offer one visible goodwill concession to reduce resistance.',
-                'description': 'Tests limits relentlessly, prioritizing wins over harmony.'
-            },
-            'H': {
-                'label': 'The Terminator',
-                'strength': 'You expose hidden issues and show you\'re no pushover.',
-                'watch_out': 'Conflict spirals drive costs and stress sky-high. Delegate communication to lawyers and seek mental-health support.',
-                'description': 'Relentless and uncompromising—demands total victory, no matter the cost.'
-            }
-        }
+    strategy_info = REGISTRY.strategies
     
     dominant = scores['dominant_strategy']
     
@@ -113,13 +217,13 @@ def generate_feedback(scores, responses):
         strategy_data = strategy_info[dominant]
         
         feedback['strategy'] = f"""
-        Your dominant divorce strategy is: {strategy_data['label']}
+        Your dominant divorce strategy is: {strategy_data.label}
         
-        {strategy_data['description']}
+        {strategy_data.description}
         
-        STRENGTH: {strategy_data['strength']}
+        STRENGTH: {strategy_data.strength}
         
-        WATCH OUT: {strategy_data['watch_out']}
+        WATCH OUT: {strategy_data.watch_out}
         """
     else:
         feedback['strategy'] = "We couldn't determine your dominant strategy clearly."
@@ -127,7 +231,7 @@ def generate_feedback(scores, responses):
     # Add feedback for tie scenarios if applicable
     if scores['has_tie']:
         tied_strategies = scores['tied_strategies']
-        tied_labels = [strategy_info[s]['label'] for s in tied_strategies if s in strategy_info]
+        tied_labels = [strategy_info[s].label for s in tied_strategies if s in strategy_info]
         feedback['tie_note'] = f"""
         Note: Your results show equal tendencies toward multiple strategies: {', '.join(tied_labels)}.
         Consider which description feels most accurate to you.
@@ -172,61 +276,35 @@ def generate_feedback(scores, responses):
     return feedback
 
 def generate_improvement_suggestions(scores, responses):
-    """Generate specific suggestions based on strategy type and matchups."""
+    """
+    Generate specific suggestions based on strategy type and matchups.
+    
+    Served from the same signature-keyed cache as generate_feedback; each
+    call gets its own lists and matchup dicts.
+    """
+    general, matchups, recommendation = _cached_suggestions(score_signature(scores))
+    suggestions = {}
+    if general is not None:
+        suggestions['general'] = list(general)
+    suggestions['matchups'] = [dict(matchup) for matchup in matchups]
+    suggestions['recommendation'] = recommendation
+    return suggestions
+
+@lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def _cached_suggestions(signature):
+    suggestions = _build_improvement_suggestions(_scores_from_signature(signature))
+    general = suggestions.get('general')
+    return (
+        tuple(general) if general is not None else None,
+        tuple(suggestions['matchups']),
+        suggestions['recommendation']
+    )
+
+def _build_improvement_suggestions(scores):
     suggestions = {}
     
     dominant = scores['dominant_strategy']
     
-    # Get matchup advice from questionnaire
-    try:
-        matchup_advice = questionnaire.matchup_information
-    except:
-        # Fallback if not available
-        matchup_advice = [
-            {
-                'your': 'G',
-                'ex': ['C', 'H'],
-                'risk': 'Being steam-rolled; long-term insecurity.',
-                'tip': 'Add clear boundaries and retain a strong lawyer/coach.'
-            },
-            {
-                'your': 'B',
-                'ex': ['H'],
-                'risk': 'Fair offers seen as weakness; dragged into conflict.',
-                'tip': 'Insist on written protocols; document everything.'
-            },
-            {
-                'your': 'C',
-                'ex': ['G'],
-                'risk': 'Asset win may harm co-parenting or reputation.',
-                'tip': 'Consider child-centered compromises; show goodwill.'
-            },
-            {
-                'your': 'C',
-                'ex': ['C'],
-                'risk': 'Legal arms-race and ballooning costs.',
-                'tip': 'Propose capped-fee mediation or arbitration.'
-            },
-            {
-                'your': 'H',
-                'ex': ['G','B','C','H'],
-                'risk': 'High stress and runaway fees.',
-                'tip': 'Shift toward assertive (not punitive) tactics; prioritize therapy.'
-            },
-            {
-                'your': 'G',
-                'ex': ['B'],
-                'risk': 'Over-giving despite balanced offers.',
-                'tip': 'Mirror your ex\'s firmness; ask for equitable splits.'
-            },
-            {
-                'your': 'B',
-                'ex': ['C'],
-                'risk': 'Gradual concession creep.',
-                'tip': 'Define red-lines early; use a mediator to enforce them.'
-            }
-        ]
-    
     # General suggestions based on dominant strategy
     if dominant == 'G':
         suggestions['general'] = [
@@ -258,15 +336,7 @@ def generate_improvement_suggestions(scores, responses):
         ]
     
     # Add matchup-specific advice
-    suggestions['matchups'] = []
-    for advice in matchup_advice:
-        if advice['your'] == dominant:
-            suggestion = {
-                'ex_type': ', '.join([get_strategy_name(ex) for ex in advice['ex']]),
-                'risk': advice['risk'],
-                'tip': advice['tip']
-            }
-            suggestions['matchups'].append(suggestion)
+    suggestions['matchups'] = list(MATCHUP_INDEX.get(dominant, ()))
     
     # Add overall recommendation
     if dominant in ['G', 'H']:
@@ -278,10 +348,23 @@ def generate_improvement_suggestions(scores, responses):
 
 def get_strategy_name(code):
     """Convert strategy code to name."""
-    strategy_names = {
-        'G': 'The People‑Pleaser',
-        'B': 'The Diplomat',
-        'C': 'The Challenger',
-        'H': 'The Terminator'
-    }
-    return strategy_names.get(code, code)
+    return REGISTRY.strategy_name(code)
+
+def advice_breakdown(strategy_counts):
+    """
+    Work out how often each piece of matchup advice was given.
+    
+    Every respondent receives all matchup advice for their dominant strategy,
+    so counts come straight from the dominant-strategy totals.
+    
+    Args:
+        strategy_counts: Iterable of (dominant strategy code, respondent count)
+    
+    Returns:
+        List of (strategy name, ex-partner types, risk, tip, times given) tuples
+    """
+    rows = []
+    for code, count in strategy_counts:
+        for matchup in MATCHUP_INDEX.get(code, ()):
+            rows.append((get_strategy_name(code), matchup['ex_type'], matchup['risk'], matchup['tip'], count))
+    return rows
@@ -1,23 +1,10 @@
+import os
+import uuid
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import base64
-from PIL import Image
-from io import BytesIO
 from questionnaire import get_questionnaire_sections
-from analyzer import calculate_scores, generate_feedback, generate_improvement_suggestions
-from email_sender import send_results_email
-from utils import create_report_html
-from database import save_assessment_result
-import time
-
-# Function to load and display car image
-def get_car_image_base64():
-    # Placeholder base64 image - this simulates the car image
-    return """
-    iVBORw0KGgoAAAANSUhEUgAAASwAAACoCAMAAABt9SM9AAAAA1BMVEX/XgA92nntAAAAR0lEQVR4nO3BAQEAAACCIP+vbkhAAQAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAO8GxYgAAb0jQ/cAAAAASUVORK5CYII=
-    """
+from assets import asset_url
+from submission import submit, SUCCESS, DUPLICATE, IN_PROGRESS
+from metrics import SUBMISSIONS_TOTAL, start_exporters
 
 # Page configuration
 st.set_page_config(
@@ -27,6 +14,9 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# Serve or write metrics if METRICS_PORT / METRICS_FILE are set (once per process)
+start_exporters()
+
 # Initialize session state variables
 if 'current_section' not in st.session_state:
     st.session_state.current_section = 0
@@ -34,14 +24,99 @@ if 'responses' not in st.session_state:
     st.session_state.responses = {}
 if 'email_sent' not in st.session_state:
     st.session_state.email_sent = False
+if 'submission_token' not in st.session_state:
+    st.session_state.submission_token = uuid.uuid4().hex
 
 # Get questionnaire sections
 sections = get_questionnaire_sections()
 total_sections = len(sections)
 
+# Navigation mode: 'server' (the default) pages through one section per
+# rerun; 'client' (opt in with QUESTIONNAIRE_NAVIGATION=client) renders every
+# section at once in tabs inside a single form, so moving between sections
+# happens in the browser and the script only reruns on Submit
+NAVIGATION_MODE = os.environ.get("QUESTIONNAIRE_NAVIGATION", "server")
+
+def render_question(question, responses):
+    """
+    Render the input widget(s) for a question.
+    
+    Args:
+        question: Question definition from the questionnaire
+        responses: Dictionary the widget values are recorded in
+    """
+    question_id = question.id
+    question_text = question.text
+    question_type = question.type
+    
+    if question_type == 'open_ended':
+        response = st.text_area(question_text, key=question_id)
+        responses[question_id] = response
+    
+    elif question_type == 'single_choice':
+        options = question.options
+        response = st.radio(question_text, options, key=question_id)
+        responses[question_id] = response
+    
+    elif question_type == 'multiple_choice':
+        options = question.options
+        st.write(question_text)
+        for option in options:
+            responses[f"{question_id}_{option}"] = st.checkbox(option, key=f"{question_id}_{option}")
+    
+    elif question_type == 'rating':
+        options = question.options
+        response = st.select_slider(question_text, options=options, key=question_id)
+        responses[question_id] = response
+    
+    elif question_type == 'conditional':
+        main_response = st.radio(question_text, question.options, key=f"{question_id}_main")
+        responses[f"{question_id}_main"] = main_response
+        
+        follow_up = question.follow_up
+        if follow_up is not None and main_response == follow_up.condition:
+            follow_up_response = st.text_area(follow_up.text, key=f"{question_id}_follow_up")
+            responses[f"{question_id}_follow_up"] = follow_up_response
+    
+    elif question_type == 'email':
+        response = st.text_input(question_text, key=question_id)
+        responses[question_id] = response
+    
+    st.markdown("---")
+
+def submit_responses(responses):
+    """
+    Score a completed questionnaire, save it and queue the results email.
+    
+    Args:
+        responses: Answers from the final form submission
+    """
+    # Validate email at submission
+    email = responses.get('email', '').strip()
+    if not email or '@' not in email or '.' not in email:
+        st.error("Please enter a valid email address to receive your results.")
+        SUBMISSIONS_TOTAL.inc(result='invalid_email')
+        return
+    
+    # Save final responses
+    st.session_state.responses.update(responses)
+    
+    with st.spinner("Analyzing your strategy profile and preparing your personalized report..."):
+        result = submit(st.session_state.submission_token, email, st.session_state.responses)
+    
+    if result in (SUCCESS, DUPLICATE):
+        st.session_state.email_sent = True
+        st.rerun()
+    elif result == IN_PROGRESS:
+        st.info("Your results are already being prepared.")
+    else:
+        st.error("There was an issue sending your results. Please try again.")
+
+
 # Header will be created with custom style below
 
-# Create a yellow box with car image and white text
+# Create a yellow box with car image and white text; the image is served
+# as a static file so reruns don't resend it
 st.markdown("""
 <style>
 @import url('https://fonts.googleapis.com/css2?family=Roboto:wght@700&display=swap');
@@ -85,7 +160,7 @@ st.markdown("""
     font-size: 1.1em; /* Updated to 1.1em as requested */
 }
 .car-background {
-    background-image: url('data:image/jpeg;base64,/9j/4AAQSkZJRgABAQEASABIAAD/4QO2aHR0cDovL25zLmFkb2JlLmNvbS94YXAvMS4wLwA8P3hwYWNrZXQgYmVnaW49Iu+7vyIgaWQ9Ilc1TTBNcENlaGlIenJlU3pOVGN6a2M5ZCI/Pgo8eDp4bXBtZXRhIHhtbG5zOng9ImFkb2JlOm5zOm1ldGEvIiB4OnhtcHRrPSJBZG9iZSBYTVAgQ29yZSA1LjYtYzE0NSA3OS4xNjM0OTksIDIwMTgvMDgvMTMtMTY6NDA6MjIgICAgICAgICI+CiAgIDxyZGY6UkRGIHhtbG5zOnJkZj0iaHR0cDovL3d3dy53My5vcmcvMTk5OS8wMi8yMi1yZGYtc3ludGF4LW5zIyI+CiAgICAgIDxyZGY6RGVzY3JpcHRpb24gcmRmOmFib3V0PSIiCiAgICAgICAgICAgIHhtbG5zOmRjPSJodHRwOi8vcHVybC5vcmcvZGMvZWxlbWVudHMvMS4xLyIKICAgICAgICAgICAgeG1sbnM6eG1wPSJodHRwOi8vbnMuYWRvYmUuY29tL3hhcC8xLjAvIgogICAgICAgICAgICB4bWxuczp4bXBNTT0iaHR0cDovL25zLmFkb2JlLmNvbS94YXAvMS4wL21tLyIKICAgICAgICAgICAgeG1sbnM6c3RSZWY9Imh0dHA6Ly9ucy5hZG9iZS5jb20veGFwLzEuMC9zVHlwZS9SZXNvdXJjZVJlZiMiPgogICAgICAgICA8ZGM6c3ViamVjdD4KICAgICAgICAgICAgPHJkZjpCYWcvPgogICAgICAgICA8L2RjOnN1YmplY3Q+CiAgICAgICAgIDx4bXA6TW9kaWZ5RGF0ZT4yMDE5LTAyLTI2VDIyOjI4OjUzLTA1OjAwPC94bXA6TW9kaWZ5RGF0ZT4KICAgICAgICAgPHhtcDpDcmVhdG9yVG9vbD5BZG9iZSBQaG90b3Nob3AgQ0MgMjAxOSAoTWFjaW50b3NoKTwveG1wOkNyZWF0b3JUb29sPgogICAgICAgICA8eG1wTU06SW5zdGFuY2VJRD54bXAuaWlkOjI2QUIwN0I3QTUxMzExRTk5MTEyQTQyMTk0QTI5MkYwPC94bXBNTTpJbnN0YW5jZUlEPgogICAgICAgICA8eG1wTU06RG9jdW1lbnRJRD54bXAuZGlkOjI2QUIwN0I4QTUxMzExRTk5MTEyQTQyMTk0QTI5MkYwPC94bXBNTTpEb2N1bWVudElEPgogICAgICAgICA8eG1wTU06RGVyaXZlZEZyb20gcmRmOnBhcnNlVHlwZT0iUmVzb3VyY2UiPgogICAgICAgICAgICA8c3RSZWY6aW5zdGFuY2VJRD54bXAuaWlkOjI2QUIwN0I1QTUxMzExRTk5MTEyQTQyMTk0QTI5MkYwPC9zdFJlZjppbnN0YW5jZUlEPgogICAgICAgICAgICA8c3RSZWY6ZG9jdW1lbnRJRD54bXAuZGlkOjI2QUIwN0I2QTUxMzExRTk5MTEyQTQyMTk0QTI5MkYwPC9zdFJlZjpkb2N1bWVudElEPgogICAgICAgICA8L3htcE1NOkRlcml2ZWRGcm9tPgogICAgICA8L3JkZjpEZXNjcmlwdGlvbj4KICAgPC9yZGY6UkRGPgo8L3g6eG1wbWV0YT4KPD94cGFja2V0IGVuZD0iciI/Pv/tAKBQaG90b3Nob3AgMy4wADhCSU0EBAAAAAAAWBwCUAAMSlVTVCBTRVBBUkFURUQcAngAH0EgUG9kY2FzdCBmb3IgRGl2b3JjZSAmIFNlcGFyYXRpb24cAnwAGHdpdGggS2FyZW4gT21hbmQsIEIuQS5Tb2M4QklNBCUAAAAAABAZOVXq9NoAr98TKk0xh0lc/+IMWElDQ19QUk9GSUxFAAEBAAAMSExpbm8CEAAAbW50clJHQiBYWVogB84AAgAJAAYAMQAAYWNzcE1TRlQAAAAASUVDIHNSR0IAAAAAAAAAAAAAAAAAAPbWAAEAAAAA0y1IUCAgAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAARY3BydAAAAVAAAAAzZGVzYwAAAYQAAABsd3RwdAAAAfAAAAAUYmtwdAAAAgQAAAAUclhZWgAAAhgAAAAUZ1hZWgAAAiwAAAAUYlhZWgAAAkAAAAAUZG1uZAAAAlQAAABwZG1kZAAAAsQAAACIdnVlZAAAA0wAAACGdmlldwAAA9QAAAAkbHVtaQAAA/gAAAAUbWVhcwAABAwAAAAkdGVjaAAABDAAAAAMclRSQwAABDwAAAgMZ1RSQwAABDwAAAgMYlRSQwAABDwAAAgMdGV4dAAAAABDb3B5cmlnaHQgKGMpIDE5OTggSGV3bGV0dC1QYWNrYXJkIENvbXBhbnkAAGRlc2MAAAAAAAAAEnNSR0IgSUVDNjE5NjYtMi4xAAAAAAAAAAAAAAASc1JHQiBJRUM2MTk2Ni0yLjEAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAFhZWiAAAAAAAADzUQABAAAAARbMWFlaIAAAAAAAAAAAAAAAAAAAAABYWVogAAAAAAAAb6IAADj1AAADkFhZWiAAAAAAAABimQAAt4UAABjaWFlaIAAAAAAAACSgAAAPhAAAts9kZXNjAAAAAAAAABZJRUMgaHR0cDovL3d3dy5pZWMuY2gAAAAAAAAAAAAAABZJRUMgaHR0cDovL3d3dy5pZWMuY2gAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAZGVzYwAAAAAAAAAuSUVDIDYxOTY2LTIuMSBEZWZhdWx0IFJHQiBjb2xvdXIgc3BhY2UgLSBzUkdCAAAAAAAAAAAAAAAuSUVDIDYxOTY2LTIuMSBEZWZhdWx0IFJHQiBjb2xvdXIgc3BhY2UgLSBzUkdCAAAAAAAAAAAAAAAAAAAAAAAAAAAAAGRlc2MAAAAAAAAALFJlZmVyZW5jZSBWaWV3aW5nIENvbmRpdGlvbiBpbiBJRUM2MTk2Ni0yLjEAAAAAAAAAAAAAACxSZWZlcmVuY2UgVmlld2luZyBDb25kaXRpb24gaW4gSUVDNjE5NjYtMi4xAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAB2aWV3AAAAAAATpP4AFF8uABDPFAAD7cwABBMLAANcngAAAAFYWVogAAAAAABMCVYAUAAAAFcf521lYXMAAAAAAAAAAQAAAAAAAAAAAAAAAAAAAAAAAAKPAAAAAnNpZyAAAAAAQ1JUIGN1cnYAAAAAAAAEAAAAAAUACgAPABQAGQAeACMAKAAtADIANwA7AEAARQBKAE8AVABZAF4AYwBoAG0AcgB3AHwAgQCGAIsAkACVAJoAnwCkAKkArgCyALcAvADBAMYAywDQANUA2wDgAOUA6wDwAPYA+wEBAQcBDQETARkBHwElASsBMgE4AT4BRQFMAVIBWQFgAWcBbgF1AXwBgwGLAZIBmgGhAakBsQG5AcEByQHRAdkB4QHpAfIB+gIDAgwCFAIdAiYCLwI4AkECSwJUAl0CZwJxAnoChAKOApgCogKsArYCwQLLAtUC4ALrAvUDAAMLAxYDIQMtAzgDQwNPA1oDZgNyA34DigOWA6IDrgO6A8cD0wPgA+wD+QQGBBMEIAQtBDsESARVBGMEcQR+BIwEmgSoBLYExATTBOEE8AT+BQ0FHAUrBToFSQVYBWcFdwWGBZYFpgW1BcUF1QXlBfYGBgYWBicGNwZIBlkGagZ7BowGnQavBsAG0QbjBvUHBwcZBysHPQdPB2EHdAeGB5kHrAe/B9IH5Qf4CAsIHwgyCEYIWghuCIIIlgiqCL4I0gjnCPsJEAklCToJTwlkCXkJjwmkCboJzwnlCfsKEQonCj0KVApqCoEKmAquCsUK3ArzCwsLIgs5C1ELaQuAC5gLsAvIC+EL+QwSDCoMQwxcDHUMjgynDMAM2QzzDQ0NJg1ADVoNdA2ODakNww3eDfgOEw4uDkkOZA5/DpsOtg7SDu4PCQ8lD0EPXg96D5YPsw/PD+wQCRAmEEMQYRB+EJsQuRDXEPURExExEU8RbRGMEaoRyRHoEgcSJhJFEmQShBKjEsMS4xMDEyMTQxNjE4MTpBPFE+UUBhQnFEkUahSLFK0UzhTwFRIVNBVWFXgVmxW9FeAWAxYmFkkWbBaPFrIW1hb6Fx0XQRdlF4kXrhfSF/cYGxhAGGUYihivGNUY+hkgGUUZaxmRGbcZ3RoEGioaURp3Gp4axRrsGxQbOxtjG4obshvaHAIcKhxSHHscoxzMHPUdHh1HHXAdmR3DHeweFh5AHmoelB6+HukfEx8+H2kflB+/H+ogFSBBIGwgmCDEIPAhHCFIIXUhoSHOIfsiJyJVIoIiryLdIwojOCNmI5QjwiPwJB8kTSR8JKsk2iUJJTglaCWXJccl9yYnJlcmhya3JugnGCdJJ3onqyfcKA0oPyhxKKIo1CkGKTgpaymdKdAqAio1KmgqmyrPKwIrNitpK50r0SwFLDksbiyiLNctDC1BLXYtqy3hLhYuTC6CLrcu7i8kL1ovkS/HL/4wNTBsMKQw2zESMUoxgjG6MfIyKjJjMpsy1DMNM0YzfzO4M/E0KzRlNJ402DUTNU01hzXCNf02NzZyNq426TckN2A3nDfXOBQ4UDiMOMg5BTlCOX85vDn5OjY6dDqyOu87LTtrO6o76DwnPGU8pDzjPSI9YT2hPeA+ID5gPqA+4D8hP2E/oj/iQCNAZECmQOdBKUFqQaxB7kIwQnJCtUL3QzpDfUPARANER0SKRM5FEkVVRZpF3kYiRmdGq0bwRzVHe0fASAVIS0iRSNdJHUljSalJ8Eo3Sn1KxEsMS1NLmkviTCpMcky6TQJNSk2TTdxOJU5uTrdPAE9JT5NP3VAnUHFQu1EGUVBRm1HmUjFSfFLHUxNTX1OqU/ZUQlSPVNtVKFV1VcJWD1ZcVqlW91dEV5JX4FgvWH1Yy1kaWWlZuFoHWlZaplr1W0VblVvlXDVchlzWXSddeF3JXhpebF69Xw9fYV+zYAVgV2CqYPxhT2GiYfViSWKcYvBjQ2OXY+tkQGSUZOllPWWSZedmPWaSZuhnPWeTZ+loP2iWaOxpQ2maafFqSGqfavdrT2una/9sV2yvbQhtYG25bhJua27Ebx5veG/RcCtwhnDgcTpxlXHwcktypnMBc11zuHQUdHB0zHUodYV14XY+dpt2+HdWd7N4EXhueMx5KnmJeed6RnqlewR7Y3vCfCF8gXzhfUF9oX4BfmJ+wn8jf4R/5YBHgKiBCoFrgc2CMIKSgvSDV4O6hB2EgITjhUeFq4YOhnKG14c7h5+IBIhpiM6JM4mZif6KZIrKizCLlov8jGOMyo0xjZiN/45mjs6PNo+ekAaQbpDWkT+RqJIRknqS45NNk7aUIJSKlPSVX5XJljSWn5cKl3WX4JhMmLiZJJmQmfyaaJrVm0Kbr5wcnImc951kndKeQJ6unx2fi5/6oGmg2KFHobaiJqKWowajdqPmpFakx6U4pammGqaLpv2nbqfgqFKoxKk3qamqHKqPqwKrdavprFys0K1ErbiuLa6hrxavi7AAsHWw6rFgsdayS7LCszizrrQltJy1E7WKtgG2ebbwt2i34LhZuNG5SrnCuju6tbsuu6e8IbypvQW9j74KvoS+/796v/XAcMDswWfB48JfwtvDWMPUxFHEzsVLxcjGRsbDx0HHv8g9yLzJOsm5yjjKt8s2y7bMNcy1zTXNtc42zrbPN8+40DnQutE80b7SP9LB00TTxtRJ1MvVTtXR1lXW2Ndc1+DYZNjo2WzZ8dp22vvbgNwF3IrdEN2W3hzeot8p36/gNuC94UThzOJT4tvjY+Pr5HPk/OWE5g3mlucf56noMui86Ubp0Opb6uXrcOv77IbtEe2c7ijutO9A78zwWPDl8XLx//KM8xnzp/Q09ML1UPXe9m32+/eK+Bn4qPk4+cf6V/rn+3f8B/yY/Sn9uv5L/tz/bf//');
+    background-image: url('""" + asset_url("car_header.jpg") + """');
     background-position: center;
     background-repeat: no-repeat;
     background-size: contain;
@@ -140,11 +215,13 @@ if st.session_state.email_sent:
             st.session_state.current_section = 0
             st.session_state.responses = {}
             st.session_state.email_sent = False
+            # A new attempt is a new submission, even with identical answers
+            st.session_state.submission_token = uuid.uuid4().hex
             st.rerun()
-    
+
 else:
     # Display branded introduction
-    if st.session_state.current_section == 0:
+    if NAVIGATION_MODE == 'client' or st.session_state.current_section == 0:
         st.markdown("""
         <div style="text-align: center; margin-bottom: 20px; padding: 15px; background-color: #fff; border: 2px solid #FFD700; border-radius: 10px;">
             <p style="color: #000; font-size: 18px;">This questionnaire will help identify your divorce negotiation strategy and provide personalized recommendations. Upon completion, you'll receive detailed results via email.</p>
@@ -152,147 +229,73 @@ else:
         """, unsafe_allow_html=True)
         
         # Removed the icons and text as requested
-            
-    # Progress bar
-    progress = st.session_state.current_section / total_sections
-    st.progress(progress)
-    st.write(f"Section {st.session_state.current_section + 1} of {total_sections}")
-
-    # Display current section
-    current_section = sections[st.session_state.current_section]
-    st.header(current_section['title'])
     
-    # Form for the current section
-    with st.form(key=f"section_{st.session_state.current_section}"):
-        responses = {}
+    if NAVIGATION_MODE == 'client':
+        st.write(f"{total_sections} sections - use the tabs to move between them, then submit from the last one")
         
-        for question in current_section['questions']:
-            question_id = question['id']
-            question_text = question['text']
-            question_type = question['type']
+        # One form for the whole questionnaire: switching tabs and answering
+        # questions stay in the browser until Submit
+        with st.form(key="questionnaire"):
+            responses = {}
             
-            if question_type == 'open_ended':
-                response = st.text_area(question_text, key=question_id)
-                responses[question_id] = response
+            tabs = st.tabs([f"{index + 1}. {section.title}" for index, section in enumerate(sections)])
+            for tab, section in zip(tabs, sections):
+                with tab:
+                    st.header(section.title)
+                    for question in section.questions:
+                        render_question(question, responses)
             
-            elif question_type == 'single_choice':
-                options = question['options']
-                response = st.radio(question_text, options, key=question_id)
-                responses[question_id] = response
-            
-            elif question_type == 'multiple_choice':
-                options = question['options']
-                st.write(question_text)
-                for option in options:
-                    responses[f"{question_id}_{option}"] = st.checkbox(option, key=f"{question_id}_{option}")
+            if st.form_submit_button("Submit"):
+                submit_responses(responses)
+    
+    else:
+        # Progress bar
+        progress = st.session_state.current_section / total_sections
+        st.progress(progress)
+        st.write(f"Section {st.session_state.current_section + 1} of {total_sections}")
+        
+        # Display current section
+        current_section = sections[st.session_state.current_section]
+        st.header(current_section.title)
+        
+        # Form for the current section
+        with st.form(key=f"section_{st.session_state.current_section}"):
+            responses = {}
             
-            elif question_type == 'rating':
-                options = question['options']
-                response = st.select_slider(question_text, options=options, key=question_id)
-                responses[question_id] = response
+            for question in current_section.questions:
+                render_question(question, responses)
             
-            elif question_type == 'conditional':
-                main_question = question['main_question']
-                main_options = question['main_options']
-                follow_up = question['follow_up']
-                
-                main_response = st.radio(main_question, main_options, key=f"{question_id}_main")
-                responses[f"{question_id}_main"] = main_response
-                
-                if main_response == follow_up['condition']:
-                    follow_up_response = st.text_area(follow_up['text'], key=f"{question_id}_follow_up")
-                    responses[f"{question_id}_follow_up"] = follow_up_response
+            # Navigation buttons
+            col1, col2 = st.columns(2)
             
-            elif question_type == 'email':
-                response = st.text_input(question_text, key=question_id)
-                responses[question_id] = response
-                
-            st.markdown("---")
-        
-        # Navigation buttons
-        col1, col2 = st.columns(2)
-        
-        # Initialize button variables to avoid unbound variable errors
-        prev_button = False
-        next_button = False
-        submit_button = False
-        
-        with col1:
-            if st.session_state.current_section > 0:
-                prev_button = st.form_submit_button("Previous")
-        with col2:
-            if st.session_state.current_section < total_sections - 1:
-                next_button = st.form_submit_button("Next")
-            else:
-                submit_button = st.form_submit_button("Submit")
-        
-        # Handle form submission
-        if next_button:
-            # Save responses and move to next section
-            st.session_state.responses.update(responses)
-            st.session_state.current_section += 1
-            st.rerun()
+            # Initialize button variables to avoid unbound variable errors
+            prev_button = False
+            next_button = False
+            submit_button = False
             
-        elif prev_button:
-            # Move to previous section
-            st.session_state.current_section -= 1
-            st.rerun()
+            with col1:
+                if st.session_state.current_section > 0:
+                    prev_button = st.form_submit_button("Previous")
+            with col2:
+                if st.session_state.current_section < total_sections - 1:
+                    next_button = st.form_submit_button("Next")
+                else:
+                    submit_button = st.form_submit_button("Submit")
             
-        elif submit_button:
-            # Validate email at submission
-            email = responses.get('email', '').strip()
-            if not email or '@' not in email or '.' not in email:
-                st.error("Please enter a valid email address to receive your results.")
-            else:
-                # Save final responses
+            # Handle form submission
+            if next_button:
+                # Save responses and move to next section
                 st.session_state.responses.update(responses)
-                
-                # Show processing message
-                with st.spinner("Analyzing your strategy profile and preparing your personalized report..."):
-                    # Calculate scores
-                    scores = calculate_scores(st.session_state.responses)
-                    
-                    # Generate feedback
-                    feedback = generate_feedback(scores, st.session_state.responses)
-                    
-                    # Generate improvement suggestions
-                    suggestions = generate_improvement_suggestions(scores, st.session_state.responses)
-                    
-                    # Create HTML report
-                    html_report = create_report_html(scores, feedback, suggestions, st.session_state.responses)
-                    
-                    # Save results to database
-                    try:
-                        # Adapt the existing database save function to work with our new data format
-                        db_result = save_assessment_result(
-                            email, 
-                            {
-                                'overall': scores['overall'],
-                                'dominant_strategy': scores['dominant_strategy'],
-                                # Leave these as 0 since they're not used in the new assessment
-                                'legal_score': 0,
-                                'emotional_score': 0,
-                                'financial_score': 0,
-                                'children_score': 0,
-                                'recovery_score': 0
-                            }, 
-                            st.session_state.responses
-                        )
-                        if db_result:
-                            st.session_state.db_saved = True
-                    except Exception as e:
-                        print(f"Database error: {str(e)}")
-                        # Don't show error to user, just continue to send email
-                    
-                    # Send email with results
-                    success = send_results_email(email, html_report, scores)
-                    
-                    if success:
-                        st.session_state.email_sent = True
-                        time.sleep(1)  # Brief pause for transition
-                        st.rerun()
-                    else:
-                        st.error("There was an issue sending your results. Please try again.")
+                st.session_state.current_section += 1
+                st.rerun()
+            
+            elif prev_button:
+                # Move to previous section
+                st.session_state.current_section -= 1
+                st.rerun()
+            
+            elif submit_button:
+                submit_responses(responses)
 
 # Add CSS for Font Awesome icons
 st.markdown("""
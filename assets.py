@@ -0,0 +1,26 @@
+import os
+import hashlib
+from functools import lru_cache
+
+# Files in static/ are served by Streamlit at app/static/ when
+# server.enableStaticServing is on (see .streamlit/config.toml)
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STATIC_URL = "app/static"
+
+@lru_cache(maxsize=None)
+def asset_url(name):
+    """
+    Get the URL of a static asset, versioned by its content.
+
+    The URL changes whenever the file does, so browsers can keep cached
+    copies across page loads and still pick up new versions after a deploy.
+
+    Args:
+        name: File name relative to the static directory
+
+    Returns:
+        URL of the asset with a content hash query string
+    """
+    with open(os.path.join(STATIC_DIR, name), 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    return f"{STATIC_URL}/{name}?v={digest}"
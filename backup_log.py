@@ -0,0 +1,374 @@
+import os
+import json
+import zlib
+import queue
+import struct
+import atexit
+import logging
+import datetime
+import threading
+import traceback
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, run one writer process
+    fcntl = None
+
+# Append-only backup of every results email: records are zlib-compressed
+# JSON, written to numbered segment files that rotate by size. Each segment
+# has a tab-separated index (offset, length, timestamp, email) for lookups.
+# The app, the standalone outbox worker and manage.py can all write to the
+# same directory; an exclusive flock on its lock file serializes them.
+BACKUP_LOG_DIR = os.environ.get("BACKUP_LOG_DIR", "email_logs")
+SEGMENT_MAX_BYTES = int(os.environ.get("BACKUP_SEGMENT_MAX_BYTES", str(64 * 1024 * 1024)))
+FSYNC_INTERVAL_SECONDS = float(os.environ.get("BACKUP_FSYNC_INTERVAL_SECONDS", "1.0"))
+FSYNC_BATCH_SIZE = int(os.environ.get("BACKUP_FSYNC_BATCH_SIZE", "200"))
+
+# Frame header: payload length and CRC32 of the compressed payload
+_HEADER = struct.Struct(">II")
+_SEGMENT_PREFIX = "segment-"
+_LOCK_NAME = ".lock"
+
+logger = logging.getLogger("backup_log")
+
+_log = None
+_log_lock = threading.Lock()
+
+def _segment_name(number: int) -> str:
+    return f"{_SEGMENT_PREFIX}{number:06d}.log"
+
+def _index_path(segment_path: str) -> str:
+    return segment_path[:-len(".log")] + ".idx"
+
+def _read_frame(f) -> Optional[bytes]:
+    """Read one frame from the current position, or None at a truncated or corrupt tail."""
+    header = f.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+    length, checksum = _HEADER.unpack(header)
+    payload = f.read(length)
+    if len(payload) < length or zlib.crc32(payload) != checksum:
+        return None
+    return payload
+
+def _decode(payload: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(payload))
+
+def _indexed_end(segment_path: str) -> int:
+    """End offset of the last indexed record in a segment, or -1 if the index is unusable."""
+    try:
+        with open(_index_path(segment_path)) as index:
+            last = None
+            for line in index:
+                last = line
+    except OSError:
+        return -1
+    if last is None:
+        return 0
+    parts = last.rstrip("\n").split("\t")
+    if len(parts) != 4 or not last.endswith("\n"):
+        return -1
+    return int(parts[0]) + int(parts[1])
+
+class BackupLog:
+    """
+    Segmented, append-only backup log with a background writer.
+    
+    append() only queues the record. A writer thread compresses records,
+    appends them to the current segment and its index, and fsyncs once per
+    batch (every fsync_batch records or fsync_interval seconds, whichever
+    comes first). Segments rotate once they reach segment_max_bytes.
+    
+    Each batch is written while holding an exclusive lock on the
+    directory, so several processes can share one log. A partial frame
+    at the end of a segment is only truncated under that lock, when no
+    other writer can be in the middle of a batch.
+    """
+    
+    def __init__(self, directory: str = BACKUP_LOG_DIR, segment_max_bytes: int = SEGMENT_MAX_BYTES,
+                 fsync_interval: float = FSYNC_INTERVAL_SECONDS, fsync_batch: int = FSYNC_BATCH_SIZE):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync_interval = fsync_interval
+        self.fsync_batch = fsync_batch
+        self._queue = queue.Queue()
+        self._segment = None
+        self._index = None
+        self._segment_number = 0
+        self._segment_end = 0
+        self._closed = False
+        
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(os.path.join(directory, _LOCK_NAME), "a")
+        with self._locked():
+            self._open_last_segment()
+        self._writer = threading.Thread(target=self._run, name="backup-log-writer", daemon=True)
+        self._writer.start()
+    
+    def append(self, record: Dict[str, Any]) -> None:
+        """
+        Queue a record for writing. Returns immediately.
+        
+        Args:
+            record: JSON-serializable dict; 'timestamp' (UTC ISO format) and
+                'email' are added to the index when present
+        """
+        if self._closed:
+            raise RuntimeError("Backup log is closed")
+        self._queue.put(record)
+    
+    def flush(self) -> None:
+        """Block until every queued record has been written and fsynced."""
+        self._queue.join()
+    
+    def close(self) -> None:
+        """Write and fsync outstanding records, then stop the writer."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        self._segment.close()
+        self._index.close()
+        self._lock_file.close()
+    
+    def segments(self):
+        """Paths of all segment files, oldest first."""
+        return [
+            os.path.join(self.directory, name)
+            for name in sorted(os.listdir(self.directory))
+            if name.startswith(_SEGMENT_PREFIX) and name.endswith(".log")
+        ]
+    
+    @contextmanager
+    def _locked(self):
+        """Hold the directory's exclusive lock; other processes' writers wait."""
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+    
+    def _open_last_segment(self):
+        """Open the newest segment for appending. Call with the lock held."""
+        if self._segment is not None:
+            # Flush whatever this process buffered before repairing the tail
+            self._segment.close()
+            self._index.close()
+            self._segment = None
+        segments = self.segments()
+        if not segments:
+            self._open_segment(1)
+            return
+        
+        # The index is trusted when it ends exactly where the segment does;
+        # otherwise a writer crashed mid-batch (a live one would still hold
+        # the lock), so drop any partial frame at the end of the segment and
+        # rebuild its index from the valid frames
+        path = segments[-1]
+        if _indexed_end(path) != os.path.getsize(path):
+            self._recover_segment(path)
+        self._open_segment(int(os.path.basename(path)[len(_SEGMENT_PREFIX):-len(".log")]))
+    
+    def _catch_up(self):
+        """
+        Move to the end of the log before writing a batch. Call with the lock held.
+        
+        Another process may have appended to or rotated the segment since
+        this one last wrote; its frames are complete, since it held the lock.
+        """
+        path = os.path.join(self.directory, _segment_name(self._segment_number))
+        if self.segments()[-1:] != [path] or os.path.getsize(path) != self._segment_end:
+            self._open_last_segment()
+    
+    def _recover_segment(self, path: str):
+        entries = []
+        with open(path, "rb") as f:
+            while True:
+                offset = f.tell()
+                payload = _read_frame(f)
+                if payload is None:
+                    break
+                record = _decode(payload)
+                entries.append((offset, _HEADER.size + len(payload), record.get("timestamp", ""), record.get("email", "")))
+        valid_end = entries[-1][0] + entries[-1][1] if entries else 0
+        if valid_end != os.path.getsize(path):
+            logger.warning(f"Truncating partial record at end of {path}")
+            with open(path, "r+b") as f:
+                f.truncate(valid_end)
+        with open(_index_path(path), "w") as index:
+            for entry in entries:
+                index.write("\t".join(str(value) for value in entry) + "\n")
+    
+    def _open_segment(self, number: int):
+        if self._segment is not None:
+            self._segment.close()
+            self._index.close()
+        self._segment_number = number
+        path = os.path.join(self.directory, _segment_name(number))
+        self._segment = open(path, "ab")
+        self._index = open(_index_path(path), "a")
+        self._segment_end = self._segment.tell()
+    
+    def _write(self, record: Dict[str, Any]):
+        payload = zlib.compress(json.dumps(record, default=str).encode("utf-8"))
+        if self._segment.tell() > 0 and self._segment.tell() + _HEADER.size + len(payload) > self.segment_max_bytes:
+            self._sync()
+            self._open_segment(self._segment_number + 1)
+        
+        offset = self._segment.tell()
+        self._segment.write(_HEADER.pack(len(payload), zlib.crc32(payload)))
+        self._segment.write(payload)
+        # Emails cannot contain tabs or newlines, but keep the index parseable regardless
+        email = str(record.get("email", "")).replace("\t", " ").replace("\n", " ")
+        self._index.write(f"{offset}\t{_HEADER.size + len(payload)}\t{record.get('timestamp', '')}\t{email}\n")
+    
+    def _sync(self):
+        self._segment.flush()
+        self._index.flush()
+        os.fsync(self._segment.fileno())
+        os.fsync(self._index.fileno())
+        self._segment_end = self._segment.tell()
+    
+    def _run(self):
+        stopping = False
+        while not stopping:
+            # Block for the first record, then gather a batch to share one fsync
+            batch = [self._queue.get()]
+            deadline = datetime.datetime.now() + datetime.timedelta(seconds=self.fsync_interval)
+            while len(batch) < self.fsync_batch and batch[-1] is not None:
+                remaining = (deadline - datetime.datetime.now()).total_seconds()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            try:
+                records = [record for record in batch if record is not None]
+                stopping = len(records) < len(batch)
+                if records:
+                    with self._locked():
+                        self._catch_up()
+                        for record in records:
+                            self._write(record)
+                        self._sync()
+            except Exception as e:
+                logger.error(f"Could not write email backup: {str(e)}")
+                logger.error(traceback.format_exc())
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+def iter_index(directory: str = BACKUP_LOG_DIR, email: Optional[str] = None,
+               since: Optional[str] = None, until: Optional[str] = None) -> Iterator[tuple]:
+    """
+    Yield index entries matching the filters, oldest first.
+    
+    Args:
+        directory: Backup log directory
+        email: Only entries for this address
+        since: Only entries at or after this UTC ISO timestamp
+        until: Only entries before this UTC ISO timestamp
+    
+    Returns:
+        Iterator of (segment path, offset, length, timestamp, email) tuples
+    """
+    if not os.path.isdir(directory):
+        return
+    for name in sorted(os.listdir(directory)):
+        if not (name.startswith(_SEGMENT_PREFIX) and name.endswith(".log")):
+            continue
+        path = os.path.join(directory, name)
+        if not os.path.exists(_index_path(path)):
+            continue
+        with open(_index_path(path)) as index:
+            for line in index:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) != 4:
+                    continue
+                offset, length, timestamp, entry_email = parts
+                if email is not None and entry_email != email:
+                    continue
+                if since is not None and timestamp < since:
+                    continue
+                if until is not None and timestamp >= until:
+                    continue
+                yield path, int(offset), int(length), timestamp, entry_email
+
+def read_records(directory: str = BACKUP_LOG_DIR, email: Optional[str] = None,
+                 since: Optional[str] = None, until: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield backed-up records matching the filters, oldest first.
+    
+    Only matching records are read and decompressed; the index supplies
+    their positions.
+    
+    Args:
+        directory: Backup log directory
+        email: Only records for this address
+        since: Only records at or after this UTC ISO timestamp
+        until: Only records before this UTC ISO timestamp
+    
+    Returns:
+        Iterator of record dicts
+    """
+    open_path = None
+    f = None
+    try:
+        for path, offset, length, _, _ in iter_index(directory, email, since, until):
+            if path != open_path:
+                if f is not None:
+                    f.close()
+                f = open(path, "rb")
+                open_path = path
+            f.seek(offset)
+            payload = _read_frame(f)
+            if payload is None:
+                logger.warning(f"Skipping unreadable record at {path}:{offset}")
+                continue
+            yield _decode(payload)
+    finally:
+        if f is not None:
+            f.close()
+
+def get_backup_log() -> BackupLog:
+    """Return this process's backup log, opening it on first use."""
+    global _log
+    with _log_lock:
+        if _log is None:
+            _log = BackupLog()
+            atexit.register(_log.close)
+        return _log
+
+def record_email_backup(recipient_email: str, html_content: str, scores: Dict[str, Any],
+                        responses: Optional[Dict[str, Any]] = None,
+                        submission_key: Optional[str] = None) -> None:
+    """
+    Queue a results email for the backup log.
+    
+    Args:
+        recipient_email: User's email address
+        html_content: HTML content for the email body
+        scores: Dictionary of assessment scores
+        responses: Optional dictionary of user responses, kept so the
+            submission can be re-inserted from the backup
+        submission_key: Optional idempotency key, so re-inserting a
+            submission that is already stored does not duplicate it
+    """
+    if isinstance(html_content, bytes):
+        html_content = html_content.decode('utf-8')
+    get_backup_log().append({
+        'timestamp': datetime.datetime.utcnow().isoformat(timespec='microseconds'),
+        'email': recipient_email,
+        'html': html_content,
+        'scores': scores,
+        'responses': responses,
+        'submission_key': submission_key
+    })
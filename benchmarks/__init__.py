@@ -0,0 +1 @@
+"""Performance benchmarks. Run each module from the repository root, e.g. python -m benchmarks.db_lookup"""
@@ -0,0 +1,112 @@
+"""
+Measure assessment_results lookup latency as the table grows.
+
+Fills a scratch database in steps and times the two queries behind
+get_assessment_results: the per-user lookup (filter by email, newest
+first) and the admin listing (newest 100 rows).
+
+Usage (from the repository root):
+    python -m benchmarks.db_lookup --rows 1000000
+    python -m benchmarks.db_lookup --rows 1000000 --no-indexes
+    python -m benchmarks.db_lookup --database-url postgresql://localhost/bench
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import datetime
+import tempfile
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Final table size")
+    parser.add_argument("--steps", type=int, default=4, help="Number of measurement points (sizes grow by 10x up to --rows)")
+    parser.add_argument("--queries", type=int, default=200, help="Lookups timed per measurement point")
+    parser.add_argument("--rows-per-email", type=int, default=3, help="Average submissions per address")
+    parser.add_argument("--database-url", default=None, help="Scratch database (default: temporary SQLite file)")
+    parser.add_argument("--no-indexes", action="store_true", help="Drop the lookup indexes to compare against a full scan")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    
+    scratch_dir = None
+    if args.database_url is None:
+        scratch_dir = tempfile.mkdtemp(prefix="db_lookup_")
+        args.database_url = f"sqlite:///{os.path.join(scratch_dir, 'bench.db')}"
+    
+    # database reads DATABASE_URL at import time
+    os.environ["DATABASE_URL"] = args.database_url
+    import database
+    from sqlalchemy import insert, text
+    
+    table = database.AssessmentResult.__table__
+    if args.no_indexes:
+        for index in table.indexes:
+            index.drop(bind=database.engine, checkfirst=True)
+    
+    sizes = sorted({max(1, args.rows // (10 ** step)) for step in range(args.steps)})
+    email_count = max(1, args.rows // args.rows_per_email)
+    start_time = datetime.datetime(2020, 1, 1)
+    rng = random.Random(42)
+    
+    print(f"Database: {database.engine.dialect.name}  indexes: {'off' if args.no_indexes else 'on'}")
+    print(f"{'rows':>12} {'by email (ms)':>15} {'newest 100 (ms)':>17}")
+    
+    inserted = 0
+    for size in sizes:
+        # Grow the table to the next measurement point
+        with database.engine.begin() as conn:
+            while inserted < size:
+                chunk = min(50_000, size - inserted)
+                conn.execute(insert(table), [
+                    {
+                        'email': f"user{rng.randrange(email_count)}@example.com",
+                        'age': '',
+                        'divorce_stage': '',
+                        'overall_score': rng.choice(range(30, 101, 10)),
+                        'created_at': start_time + datetime.timedelta(seconds=inserted + i),
+                    }
+                    for i in range(chunk)
+                ])
+                inserted += chunk
+        
+        if database.engine.dialect.name == 'postgresql':
+            with database.engine.begin() as conn:
+                conn.execute(text("ANALYZE assessment_results"))
+        
+        by_email = []
+        for _ in range(args.queries):
+            email = f"user{rng.randrange(email_count)}@example.com"
+            started = time.perf_counter()
+            database.get_assessment_results(email=email)
+            by_email.append(time.perf_counter() - started)
+        
+        newest = []
+        for _ in range(max(1, args.queries // 10)):
+            started = time.perf_counter()
+            database.get_assessment_results()
+            newest.append(time.perf_counter() - started)
+        
+        by_email.sort()
+        newest.sort()
+        print(f"{size:>12,} {by_email[len(by_email) // 2] * 1000:>15.2f} {newest[len(newest) // 2] * 1000:>17.2f}")
+    
+    # Show the plan for the per-user lookup so index use can be confirmed
+    explain = "EXPLAIN QUERY PLAN" if database.engine.dialect.name == 'sqlite' else "EXPLAIN"
+    with database.engine.connect() as conn:
+        plan = conn.execute(text(
+            f"{explain} SELECT * FROM assessment_results WHERE email = :email ORDER BY created_at DESC LIMIT 100"
+        ), {'email': 'user1@example.com'}).fetchall()
+    print("\nPlan for lookup by email:")
+    for row in plan:
+        print("  " + " | ".join(str(value) for value in row))
+    
+    if scratch_dir:
+        database.engine.dispose()
+        os.remove(os.path.join(scratch_dir, 'bench.db'))
+        os.rmdir(scratch_dir)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Check the cold-start import cost of the respondent page.
+
+Runs a fresh interpreter with -X importtime, imports the modules app.py
+loads at the top of the script, and reports the cumulative import time of
+each one. Streamlit itself is imported first and reported separately,
+since the app cannot avoid it. Exits non-zero if the app's own imports
+exceed the budget or pull in a library that only the submit path, the
+admin dashboard or exports need.
+
+Usage (from the repository root):
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget-ms 150 --repeat 5
+"""
+import os
+import ast
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Maximum import time of the app's own modules, in milliseconds
+BUDGET_MS = 150.0
+
+# Libraries that must not be loaded before a respondent submits
+DEFERRED_MODULES = ('pandas', 'sqlalchemy', 'numpy', 'pyarrow', 'database', 'email_queue', 'email_sender')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS, help="Maximum import time for the app's own modules")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters to run; the median is reported")
+    parser.add_argument("--script", default=os.path.join(ROOT, "app.py"), help="Streamlit script whose imports are measured")
+    return parser.parse_args()
+
+def top_level_imports(script):
+    """Return the modules a script imports at module level, in order."""
+    with open(script) as f:
+        tree = ast.parse(f.read())
+    
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+def startup_modules(script):
+    """Return streamlit followed by the other modules the script imports at startup."""
+    modules = [name for name in top_level_imports(script) if name != 'streamlit']
+    return ['streamlit'] + modules
+
+def measure(modules):
+    """
+    Import modules in a fresh interpreter under -X importtime.
+    
+    Args:
+        modules: Module names, imported in order
+    
+    Returns:
+        Tuple of ({module: cumulative microseconds}, set of every module loaded)
+    """
+    code = "; ".join(f"import {name}" for name in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    
+    timings = {}
+    loaded = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        loaded.add(name.strip())
+        # Top-level entries are the ones not indented under another import
+        if not name.startswith("  ") and name.strip() in modules:
+            timings[name.strip()] = int(cumulative)
+    return timings, loaded
+
+def app_import_ms(runs, modules):
+    """Return the median cumulative import time of the modules other than streamlit, in ms."""
+    totals = sorted(sum(run.get(name, 0) for name in modules if name != 'streamlit') for run in runs)
+    return totals[len(totals) // 2] / 1000
+
+def main():
+    args = parse_args()
+    modules = startup_modules(args.script)
+    
+    runs = []
+    loaded = set()
+    for _ in range(args.repeat):
+        timings, loaded = measure(modules)
+        runs.append(timings)
+    
+    def median(name):
+        values = sorted(run.get(name, 0) for run in runs)
+        return values[len(values) // 2] / 1000
+    
+    print(f"{'module':<24} {'cumulative (ms)':>16}")
+    for name in modules:
+        print(f"{name:<24} {median(name):>16.1f}")
+    
+    app_ms = app_import_ms(runs, modules)
+    print(f"\nApp imports (excluding streamlit): {app_ms:.1f} ms  budget: {args.budget_ms:.1f} ms")
+    
+    failed = False
+    if app_ms > args.budget_ms:
+        print("FAIL: app imports are over budget")
+        failed = True
+    
+    eager = sorted(name for name in DEFERRED_MODULES if name in loaded)
+    if eager:
+        print(f"FAIL: loaded at startup but only needed later: {', '.join(eager)}")
+        failed = True
+    
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
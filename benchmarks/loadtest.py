@@ -0,0 +1,249 @@
+"""
+Load-test the questionnaire submit path with N concurrent respondents.
+
+Each virtual user pages through REGISTRY.sections, answering every
+question at random (with an optional think time per section), then
+submits through submission.submit, the pipeline app.py runs: idempotency
+claim, scoring, feedback, suggestions, HTML report, database save and
+outbox enqueue. The outbox worker then delivers the queued emails to a
+local stub SMTP server (benchmarks.smtp_stub), and the run waits for the
+outbox to drain.
+
+The pipeline is driven directly instead of through Streamlit, so the
+numbers are the capacity of one worker process's submit path; page
+rendering and websocket overhead are not included.
+
+Reports p50/p95/p99 submit latency, submit throughput, per-stage timings
+and email delivery time. --json writes the same figures to a file so
+runs can be compared release to release.
+
+Usage (from the repository root):
+    python -m benchmarks.loadtest --users 20 --submissions 1000
+    python -m benchmarks.loadtest --users 50 --think-ms 200 --smtp-latency-ms 30
+    python -m benchmarks.loadtest --database-url postgresql+psycopg2://localhost/bench --json loadtest.json
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import datetime
+import shutil
+import tempfile
+import threading
+from collections import defaultdict
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--submissions", type=int, default=500, help="Total submissions across all users")
+    parser.add_argument("--warmup", type=int, default=5, help="Submissions run first and left out of the results")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Pause per section while a user pages through")
+    parser.add_argument("--database-url", default=None, help="Scratch database (default: temporary SQLite file)")
+    parser.add_argument("--no-smtp-stub", action="store_true", help="Use the SMTP_* settings from the environment instead of the stub")
+    parser.add_argument("--smtp-latency-ms", type=float, default=0.0, help="Stub delay per accepted message")
+    parser.add_argument("--smtp-reject-rate", type=float, default=0.0, help="Fraction of recipients the stub rejects (0-1)")
+    parser.add_argument("--drain-timeout", type=float, default=120.0, help="Seconds to wait for the outbox to empty")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the random answers")
+    parser.add_argument("--json", default=None, help="Also write the results to this JSON file")
+    return parser.parse_args()
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+def summarize(values):
+    values = sorted(values)
+    return {
+        'mean_ms': sum(values) / len(values) * 1000 if values else 0.0,
+        'p50_ms': percentile(values, 0.50) * 1000,
+        'p95_ms': percentile(values, 0.95) * 1000,
+        'p99_ms': percentile(values, 0.99) * 1000,
+        'max_ms': values[-1] * 1000 if values else 0.0,
+    }
+
+def answer_section(section, responses, rng, user_email):
+    """Fill in one section the way the app's widgets record answers."""
+    for question in section.questions:
+        if question.type == 'multiple_choice':
+            for option in question.options:
+                responses[f"{question.id}_{option}"] = rng.random() < 0.5
+        elif question.type in ('single_choice', 'rating'):
+            responses[question.id] = rng.choice(question.options)
+        elif question.type == 'email':
+            responses[question.id] = user_email
+        else:
+            responses[question.id] = "Load test answer"
+
+class VirtualUser(threading.Thread):
+    """Pages through the questionnaire and submits until the shared quota is used up."""
+    
+    def __init__(self, number, quota, think_time, seed, sections):
+        super().__init__(name=f"user-{number}", daemon=True)
+        self.number = number
+        self.quota = quota
+        self.think_time = think_time
+        self.rng = random.Random(seed + number)
+        self.sections = sections
+        self.latencies = []
+        self.stage_times = defaultdict(list)
+        self.failures = 0
+    
+    def run(self):
+        # Imported here, after main() has configured the environment
+        from submission import submit, SUCCESS
+        
+        while self.quota.take():
+            # Each submission is a fresh session, as after "Take the Assessment Again"
+            token = uuid.uuid4().hex
+            email = f"loadtest{self.number}-{self.rng.randrange(10 ** 9)}@example.com"
+            responses = {}
+            for section in self.sections:
+                answer_section(section, responses, self.rng, email)
+                if self.think_time:
+                    time.sleep(self.think_time)
+            
+            stages = {}
+            started = time.perf_counter()
+            try:
+                ok = submit(token, email, responses, stages) == SUCCESS
+            except Exception as e:
+                print(f"{self.name}: submission raised {type(e).__name__}: {e}")
+                ok = False
+            elapsed = time.perf_counter() - started
+            
+            if not ok:
+                self.failures += 1
+                continue
+            self.latencies.append(elapsed)
+            for stage, seconds in stages.items():
+                self.stage_times[stage].append(seconds)
+
+class Quota:
+    """Thread-safe countdown of submissions left to run."""
+    
+    def __init__(self, total):
+        self.remaining = total
+        self._lock = threading.Lock()
+    
+    def take(self):
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+def run_users(count, submissions, think_time, seed, sections):
+    quota = Quota(submissions)
+    users = [VirtualUser(number, quota, think_time, seed, sections) for number in range(count)]
+    started = time.perf_counter()
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    return users, time.perf_counter() - started
+
+def main():
+    args = parse_args()
+    
+    scratch_dir = tempfile.mkdtemp(prefix="loadtest_")
+    if args.database_url is None:
+        args.database_url = f"sqlite:///{os.path.join(scratch_dir, 'loadtest.db')}"
+    
+    # database, backup_log and the SMTP pool read their settings from the
+    # environment, so configure it before the first import
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["BACKUP_LOG_DIR"] = os.path.join(scratch_dir, "email_logs")
+    stub = None
+    if not args.no_smtp_stub:
+        from benchmarks.smtp_stub import start_stub
+        stub = start_stub(latency=args.smtp_latency_ms / 1000, reject_rate=args.smtp_reject_rate)
+        os.environ.update({
+            "SMTP_SERVER": stub.server_address[0],
+            "SMTP_PORT": str(stub.server_address[1]),
+            "SMTP_USERNAME": "loadtest",
+            "SMTP_PASSWORD": "loadtest",
+            "EMAIL_SENDER": "loadtest@example.com",
+            "SMTP_STARTTLS": "false",
+        })
+    
+    import database
+    from questionnaire import REGISTRY
+    from submission import STAGES
+    
+    sections = REGISTRY.sections
+    think_time = args.think_ms / 1000
+    print(f"Database: {database.engine.dialect.name}  users: {args.users}  submissions: {args.submissions}  "
+          f"sections: {len(sections)}  think time: {args.think_ms:g} ms/section")
+    
+    # Warm imports, caches and connection pools outside the measurement
+    if args.warmup:
+        run_users(1, args.warmup, 0.0, args.seed - 1, sections)
+    
+    users, wall_time = run_users(args.users, args.submissions, think_time, args.seed, sections)
+    submit_done = time.perf_counter()
+    
+    # Wait for the outbox worker to deliver everything that was queued
+    pending = database.count_pending_emails()
+    while pending and time.perf_counter() - submit_done < args.drain_timeout:
+        time.sleep(0.1)
+        pending = database.count_pending_emails()
+    drain_time = time.perf_counter() - submit_done
+    
+    latencies = [value for user in users for value in user.latencies]
+    failures = sum(user.failures for user in users)
+    stage_summary = {
+        stage: summarize([value for user in users for value in user.stage_times[stage]])
+        for stage in STAGES
+    }
+    results = {
+        'timestamp': datetime.datetime.utcnow().isoformat(timespec='seconds'),
+        'database': database.engine.dialect.name,
+        'users': args.users,
+        'submissions': len(latencies),
+        'failures': failures,
+        'think_ms': args.think_ms,
+        'wall_seconds': wall_time,
+        'throughput_per_second': len(latencies) / wall_time if wall_time else 0.0,
+        'submit_latency': summarize(latencies),
+        'stages': stage_summary,
+        'drain_seconds': drain_time,
+        'pending_after_drain': pending,
+    }
+    if stub is not None:
+        results['smtp'] = {'connections': stub.connections, 'messages': stub.messages, 'rejected': stub.rejected}
+    
+    latency = results['submit_latency']
+    print(f"\nSubmitted {len(latencies)} in {wall_time:.2f}s ({results['throughput_per_second']:.1f}/s), {failures} failed")
+    print(f"Submit latency ms: p50 {latency['p50_ms']:.1f}  p95 {latency['p95_ms']:.1f}  "
+          f"p99 {latency['p99_ms']:.1f}  max {latency['max_ms']:.1f}")
+    print(f"\n{'stage':<12} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for stage in STAGES:
+        summary = stage_summary[stage]
+        print(f"{stage:<12} {summary['mean_ms']:>9.2f} {summary['p50_ms']:>9.2f} {summary['p95_ms']:>9.2f} {summary['p99_ms']:>9.2f}")
+    print(f"\nOutbox drained in {drain_time:.2f}s ({pending} still pending)")
+    if stub is not None:
+        print(f"SMTP stub: {stub.messages} messages over {stub.connections} connections, {stub.rejected} rejected")
+    
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+    
+    if stub is not None:
+        stub.shutdown()
+    from backup_log import get_backup_log
+    get_backup_log().close()
+    database.engine.dispose()
+    shutil.rmtree(scratch_dir, ignore_errors=True)
+    
+    # Failed submissions or undelivered email mean the capacity figure is not trustworthy
+    return 1 if failures or pending else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+"""
+Micro-benchmarks for the per-submission hot functions, checked against a stored baseline.
+
+Times calculate_scores, generate_feedback, generate_improvement_suggestions,
+create_report_html and the MIME build in email_sender over fixed corpora
+of synthetic responses:
+
+    typical   seeded random answers
+    ties      two- and three-way ties between strategies
+    missing   partly or entirely unanswered questionnaires
+    all_h     every answer High-Conflict
+
+Feedback and suggestions are cached per score signature and report
+fragments per rendered values, so each of those is timed twice: "warm" (cache hits, the
+common case in production) and "cold" (cache cleared before every call).
+
+Each benchmark group is timed next to a fixed calibration workload,
+and results are stored in benchmarks/micro_baseline.json relative to
+it, so a machine that is uniformly faster or busier than when the
+baseline was recorded does not report regressions. The script exits
+non-zero when a benchmark is slower than its calibrated baseline by
+more than --threshold (as a ratio) and --min-delta-us (in absolute
+terms). An apparent regression is re-timed --confirm more times and
+only counts if the fastest timing is still over the limit. Baselines
+still depend on the Python version and CPU type, so re-record them with
+--save when either changes.
+
+Usage (from the repository root):
+    python -m benchmarks.micro
+    python -m benchmarks.micro --filter report --threshold 1.25
+    python -m benchmarks.micro --save
+"""
+import os
+import sys
+import json
+import random
+import timeit
+import argparse
+import platform
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "micro_baseline.json")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file to compare against or write")
+    parser.add_argument("--save", action="store_true", help="Record this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=2.0, help="Slowdown ratio that counts as a regression")
+    parser.add_argument("--min-delta-us", type=float, default=1.0, help="Ignore slowdowns smaller than this per call")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing rounds per benchmark; the fastest is kept")
+    parser.add_argument("--confirm", type=int, default=2, help="Extra timings of an apparent regression before it counts")
+    parser.add_argument("--filter", default=None, help="Only run benchmarks whose name contains this text")
+    return parser.parse_args()
+
+def build_corpora():
+    """
+    Build the fixed response corpora.
+    
+    Returns:
+        Dictionary of corpus name -> list of response dicts
+    """
+    from questionnaire import REGISTRY
+    
+    questions = [question for question in REGISTRY.questions.values() if question.strategy_values]
+    
+    def answers(codes, email="bench@example.com"):
+        # One answer per question, choosing the option that scores as the given code
+        responses = {'email': email}
+        for question, code in zip(questions, codes):
+            if code is not None:
+                responses[question.id] = question.options[question.strategy_values.index(code)]
+        return responses
+    
+    rng = random.Random(2024)
+    typical = [
+        answers([rng.choice(question.strategy_values) for question in questions], f"user{i}@example.com")
+        for i in range(200)
+    ]
+    
+    half = len(questions) // 2
+    third = len(questions) // 3
+    ties = [
+        answers(['G'] * half + ['B'] * (len(questions) - half)),
+        answers(['C'] * half + ['H'] * (len(questions) - half)),
+        answers(['B'] * third + ['C'] * third + ['H'] * third + ['G'] * (len(questions) - 3 * third)),
+        answers(['H', 'G'] * half),
+    ]
+    
+    missing = [
+        {'email': "bench@example.com"},
+        answers(['B'] + [None] * (len(questions) - 1)),
+        answers(['G', None] * half),
+        answers([None] * half + ['C'] * (len(questions) - half)),
+        # Answers that are not options of the question are ignored
+        dict(answers(['H'] * len(questions)), **{questions[0].id: "Not an option", questions[1].id: ""}),
+    ]
+    
+    all_h = [answers(['H'] * len(questions))]
+    
+    return {'typical': typical, 'ties': ties, 'missing': missing, 'all_h': all_h}
+
+def build_benchmarks():
+    """
+    Return (name, setup, call) triples.
+    
+    setup(responses) prepares the arguments once per corpus entry, outside
+    the timing; call(prepared) is the code being measured.
+    """
+    import analyzer
+    import utils
+    from analyzer import calculate_scores, generate_feedback, generate_improvement_suggestions
+    from utils import create_report_html, create_report_bytes
+    from email_sender import build_results_message
+    
+    def scored(responses):
+        return responses, calculate_scores(responses)
+    
+    def reported(responses):
+        scores = calculate_scores(responses)
+        return (scores, generate_feedback(scores, responses),
+                generate_improvement_suggestions(scores, responses), responses)
+    
+    def rendered(responses):
+        return responses['email'], create_report_html(*reported(responses))
+    
+    def rendered_bytes(responses):
+        return responses['email'], create_report_bytes(*reported(responses))
+    
+    def cold_feedback(args):
+        analyzer._cached_feedback.cache_clear()
+        return generate_feedback(args[1], args[0])
+    
+    def cold_suggestions(args):
+        analyzer._cached_suggestions.cache_clear()
+        return generate_improvement_suggestions(args[1], args[0])
+    
+    def cold_report(args):
+        utils._results_fragment.cache_clear()
+        return create_report_html(*args)
+    
+    return [
+        ("calculate_scores", lambda responses: responses, calculate_scores),
+        ("generate_feedback (warm)", scored, lambda args: generate_feedback(args[1], args[0])),
+        ("generate_feedback (cold)", scored, cold_feedback),
+        ("generate_improvement_suggestions (warm)", scored, lambda args: generate_improvement_suggestions(args[1], args[0])),
+        ("generate_improvement_suggestions (cold)", scored, cold_suggestions),
+        ("create_report_html (warm)", reported, lambda args: create_report_html(*args)),
+        ("create_report_html (cold)", reported, cold_report),
+        ("build_results_message (str)", rendered, lambda args: build_results_message("sender@example.com", *args)),
+        ("build_results_message (bytes)", rendered_bytes, lambda args: build_results_message("sender@example.com", *args)),
+    ]
+
+def time_per_call(call, prepared, repeat):
+    """
+    Time call over every prepared entry.
+    
+    Returns:
+        Fastest round's time per call, in microseconds
+    """
+    def run():
+        for args in prepared:
+            call(args)
+    
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / (number * len(prepared)) * 1e6
+
+def calibrate(repeat):
+    """
+    Time a fixed pure-Python workload of dict lookups, formatting and
+    joins, like the benchmarked code, to measure how fast the machine is
+    running right now.
+    
+    Returns:
+        Microseconds per workload call
+    """
+    table = {f"key{i}": f"value{i}" for i in range(64)}
+    keys = list(table) * 4
+    
+    def workload(_):
+        counts = {}
+        for key in keys:
+            value = table[key]
+            counts[value] = counts.get(value, 0) + 1
+        return ''.join(f"<li>{key}: {count}</li>" for key, count in counts.items())
+    
+    return time_per_call(workload, [None], repeat)
+
+def is_regression(micros, calibration, previous, args):
+    """Compare a timing with its baseline entry, both relative to their calibration."""
+    expected = previous['relative'] * calibration
+    return micros / expected > args.threshold and micros - expected > args.min_delta_us
+
+def machine_info():
+    return {'python': platform.python_version(), 'machine': platform.machine(), 'processor': platform.processor()}
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def main():
+    args = parse_args()
+    corpora = build_corpora()
+    benchmarks = build_benchmarks()
+    if args.filter:
+        benchmarks = [entry for entry in benchmarks if args.filter in entry[0]]
+    
+    baseline = None if args.save else load_baseline(args.baseline)
+    if baseline is not None and baseline.get('machine') != machine_info():
+        print(f"Note: baseline was recorded on {baseline.get('machine')}; this is {machine_info()}")
+    baseline_results = baseline['results'] if baseline else {}
+    
+    print(f"{'benchmark':<42} {'corpus':<8} {'us/call':>9} {'expected':>9} {'ratio':>7}")
+    results = {}
+    regressions = []
+    for name, setup, call in benchmarks:
+        # Calibrate next to each group of timings so drift during the run
+        # affects both sides of the comparison alike
+        calibration = calibrate(args.repeat)
+        for corpus_name, corpus in corpora.items():
+            prepared = [setup(responses) for responses in corpus]
+            key = f"{name} [{corpus_name}]"
+            micros = time_per_call(call, prepared, args.repeat)
+            previous = baseline_results.get(key)
+            
+            if previous:
+                # Re-time apparent regressions so one noisy round does not fail the run
+                for _ in range(args.confirm):
+                    if not is_regression(micros, calibration, previous, args):
+                        break
+                    calibration = min(calibration, calibrate(args.repeat))
+                    micros = min(micros, time_per_call(call, prepared, args.repeat))
+                expected = previous['relative'] * calibration
+                flag = ""
+                if is_regression(micros, calibration, previous, args):
+                    regressions.append(key)
+                    flag = "  REGRESSION"
+                print(f"{name:<42} {corpus_name:<8} {micros:>9.2f} {expected:>9.2f} {micros / expected:>6.2f}x{flag}")
+            else:
+                print(f"{name:<42} {corpus_name:<8} {micros:>9.2f} {'-':>9} {'-':>7}")
+            
+            results[key] = {'us': round(micros, 3), 'relative': round(micros / calibration, 5)}
+    
+    if args.save:
+        # Keep entries for benchmarks skipped by --filter
+        merged = dict((load_baseline(args.baseline) or {}).get('results', {}))
+        merged.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump({'machine': machine_info(), 'results': dict(sorted(merged.items()))}, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+    
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; record one with --save")
+        return 0
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:g}x baseline:")
+        for key in regressions:
+            print(f"  {key}")
+        return 1
+    print(f"\nNo regressions over {args.threshold:g}x baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Minimal SMTP server that accepts and discards mail, for load tests.
+
+Speaks enough of the protocol for smtplib (EHLO, AUTH, MAIL, RCPT, DATA,
+NOOP, RSET, QUIT) without STARTTLS, so point the app at it with
+SMTP_STARTTLS=false. Counts connections and messages, and can add a
+per-message delay, reject a fraction of recipients or drop every open
+session to model a slow or flaky provider.
+
+Usage (from the repository root):
+    python -m benchmarks.smtp_stub --port 2525
+    python -m benchmarks.smtp_stub --port 2525 --latency-ms 50 --reject-rate 0.05
+
+Or from another benchmark:
+    from benchmarks.smtp_stub import start_stub
+    server = start_stub()
+    host, port = server.server_address
+"""
+import sys
+import time
+import random
+import socket
+import argparse
+import threading
+import socketserver
+
+class SMTPStubHandler(socketserver.StreamRequestHandler):
+    """One SMTP session."""
+    
+    def reply(self, line: str):
+        self.wfile.write((line + "\r\n").encode("ascii"))
+    
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+            server.sessions.add(self.connection)
+        try:
+            self.reply("220 smtp-stub ready")
+            self.converse()
+        finally:
+            with server.lock:
+                server.sessions.discard(self.connection)
+    
+    def converse(self):
+        server = self.server
+        in_data = False
+        rejected = False
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            line = line.decode("utf-8", "replace").rstrip("\r\n")
+            
+            if in_data:
+                if line == ".":
+                    in_data = False
+                    if server.latency:
+                        time.sleep(server.latency)
+                    with server.lock:
+                        server.messages += 1
+                    self.reply("250 OK: queued")
+                continue
+            
+            command = line.split(" ", 1)[0].upper()
+            if command in ("EHLO", "HELO"):
+                self.reply("250-smtp-stub")
+                self.reply("250 AUTH PLAIN LOGIN")
+            elif command == "AUTH":
+                self.reply("235 Authentication successful")
+            elif command == "MAIL":
+                rejected = False
+                self.reply("250 OK")
+            elif command == "RCPT":
+                if server.reject_rate and server.rng.random() < server.reject_rate:
+                    rejected = True
+                    with server.lock:
+                        server.rejected += 1
+                    self.reply("450 Mailbox temporarily unavailable")
+                else:
+                    self.reply("250 OK")
+            elif command == "DATA":
+                if rejected:
+                    self.reply("554 No valid recipients")
+                else:
+                    in_data = True
+                    self.reply("354 End data with <CR><LF>.<CR><LF>")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                # NOOP, RSET and anything else
+                self.reply("250 OK")
+
+class SMTPStubServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+    
+    def __init__(self, address, latency: float = 0.0, reject_rate: float = 0.0, seed: int = 0):
+        super().__init__(address, SMTPStubHandler)
+        self.latency = latency
+        self.reject_rate = reject_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = 0
+        self.rejected = 0
+        self.sessions = set()
+    
+    def drop_connections(self):
+        """Close every open session without a reply, as a provider restart would."""
+        with self.lock:
+            sessions = list(self.sessions)
+        for sock in sessions:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+def start_stub(host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, reject_rate: float = 0.0) -> SMTPStubServer:
+    """
+    Start the stub on a background thread.
+    
+    Args:
+        host: Interface to listen on
+        port: Port to listen on; 0 picks a free port
+        latency: Seconds to wait before accepting each message
+        reject_rate: Fraction of recipients rejected with a temporary error
+    
+    Returns:
+        The running server; server_address holds the bound (host, port)
+    """
+    server = SMTPStubServer((host, port), latency=latency, reject_rate=reject_rate)
+    threading.Thread(target=server.serve_forever, name="smtp-stub", daemon=True).start()
+    return server
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=2525, help="Port to listen on")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay before accepting each message")
+    parser.add_argument("--reject-rate", type=float, default=0.0, help="Fraction of recipients to reject (0-1)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    server = SMTPStubServer((args.host, args.port), latency=args.latency_ms / 1000, reject_rate=args.reject_rate)
+    print(f"SMTP stub listening on {args.host}:{server.server_address[1]} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"{server.connections} connections, {server.messages} messages, {server.rejected} rejected")
+
+if __name__ == "__main__":
+    sys.exit(main())
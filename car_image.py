@@ -1,19 +0,0 @@
-# Base64 encoded image of the car
-car_image_base64 = """
-iVBORw0KGgoAAAANSUhEUgAAAyAAAAJYCAIAAAAVFBUnAAAQSmVYSWZJSSoAjwDR/wECYQSE
-3UIAmNiiM2+WKG/EY4DLtpTePuiVvl15XGrxzaQyexlSYuZNxPHsyC5fJYzlJ1NJm+1jQk0J
-R0MjKCTQbD7tBIMhZEcmMN14wW0vOG+zXVOhdKkRVl4iZNhPJtaZRnIxWGiOxm1cIzJjMDJt
-KDPMc0lZSXNhMz1fK2ZveTZXSGtWWE9daGMwUCt1SzkrMUQrL3Z2ajJaQWxGc1dHNmtXdmVQ
-ME9oRVdUQytTUzQ1TjI0MFNVb28wOGkvTUhsZ2NaWTROamM0Z1IyWC9uakJHdisxZWtMYVBT
-NXBZckhtNlBsRkwvZGx4amhkQkl4aUlQQjNlS2ZVS1R2QWdGMFh2U3RLK3RWMSsra0h3a2J2
-L3UwYzFEVE1oZTFvT05MTUVoK3FqQU9RSm51bGJyS05TdE5UWGxsWkdQREgyWm5lL1NRVVlR
-MGRDa0h1d0JDU2dubjd6SlpaRFRLZEhPcS9ObUhPNWpJTG5pL0JMRE9RQ1hJWDFXSHM4UFNw
-dHh3d21OcG50bC9uK2NXMGI2bG9GMTNZc3ZMcGtWb2MrRlF3ZU5nZXNPRHQ1cjR5d0x0RDc1
-Yk5GdkxYaE9UbkZXcmtrbkZkSDM0UndnVkRqL0Q3UkY0S3J0SERlWG81aC84N2gzKzc3eVNS
-UFVXb0RtakNCL29iZVZLV2VJbktGTWZIZXRKOGRiNXBSMkU1cEh5SEJFMlcydkhvUHMwVzlG
-U3lpWFQrSEpmOHR0UUppNG40NkpCMDZKRjZJRVJjRDV6WlJRM3UyWDFnd2Z5UXhiMnZjODFQ
-d0NNRG1LMkUvVnFMVk9QcUtEeWQ0Y2RNUHRYMnU2OTlUZ1ZHb1dDcUZnZFJKb0poVlNoaUxm
-eko1TGJQSktUQXBkY2pnWjZrOWxGOGtvZFpVallrVldYWlNjSVp3UTA5V3dXWG84d0xkLytk
-TW9EL3BFbmU1dm9jd2tCQlhRT0FMV1hpK3JsQzBvRExXRGZrRnNXcHhJMXJ1UFI5cDNzUS9q
-T09sOHlBZzRiTjc0Z2cySGV0RUxEN1FGcDl6c0xSQT09
-"""
@@ -1,8 +1,15 @@
 import os
+import io
+import re
+import json
 import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Text, Float, DateTime, JSON
+from sqlalchemy import create_engine, inspect, text, bindparam, insert, select, delete, update, func, case, cast, Column, Integer, String, Text, Float, Boolean, Date, DateTime, JSON, Index, or_
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateIndex
+from metrics import DATABASE_ERRORS_TOTAL
 
 # Create database engine
 DATABASE_URL = os.getenv("DATABASE_URL", "")
@@ -28,6 +35,9 @@ else:
         pool_recycle=3600
     )
 
+# How long adding a missing column may wait for its table lock (PostgreSQL)
+SCHEMA_LOCK_TIMEOUT = os.environ.get("SCHEMA_LOCK_TIMEOUT", "5s")
+
 # Create base class for models
 Base = declarative_base()
 
@@ -46,19 +56,237 @@ class AssessmentResult(Base):
     children_score = Column(Float, nullable=True)
     recovery_score = Column(Float, nullable=True)
     responses = Column(JSON, nullable=True)  # Store all responses as JSON
+    dominant_strategy = Column(String(1), nullable=True)  # G, B, C or H
+    g_count = Column(Integer, nullable=True)  # Questions answered per strategy
+    b_count = Column(Integer, nullable=True)
+    c_count = Column(Integer, nullable=True)
+    h_count = Column(Integer, nullable=True)
+    submission_key = Column(String(64), nullable=True)  # Idempotency key, see idempotency.py
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     
+    __table_args__ = (
+        # Per-user lookups filter by email and sort by newest first
+        Index('ix_assessment_results_email_created_at', 'email', 'created_at'),
+        # Admin listings sort the whole table by newest first
+        Index('ix_assessment_results_created_at', 'created_at'),
+        # Strategy breakdowns group by dominant strategy
+        Index('ix_assessment_results_dominant_strategy', 'dominant_strategy'),
+        # A submission is stored at most once; NULL keys (imports, replays) are not constrained
+        Index('ux_assessment_results_submission_key', 'submission_key', unique=True),
+    )
+    
     def __repr__(self):
         return f"<AssessmentResult(id={self.id}, email={self.email}, overall_score={self.overall_score})>"
 
-# Create all tables
+class EmailOutbox(Base):
+    """Durable queue of result emails waiting to be delivered by the worker."""
+    __tablename__ = "email_outbox"
+    
+    id = Column(Integer, primary_key=True)
+    recipient_email = Column(String(255), nullable=False)
+    html_content = Column(Text, nullable=False)
+    scores = Column(JSON, nullable=True)
+    responses = Column(JSON, nullable=True)
+    status = Column(String(20), nullable=False, default='pending')  # pending, sending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
+    last_error = Column(Text, nullable=True)
+    submission_key = Column(String(64), nullable=True)  # Idempotency key, see idempotency.py
+    replayed = Column(Boolean, nullable=True, default=False)  # Re-sent from the backup log, which already holds it
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index('ix_email_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+        # A submission's results email is queued at most once
+        Index('ux_email_outbox_submission_key', 'submission_key', unique=True),
+    )
+    
+    def __repr__(self):
+        return f"<EmailOutbox(id={self.id}, recipient_email={self.recipient_email}, status={self.status})>"
+
+class AssessmentRollup(Base):
+    """
+    Pre-aggregated counts for the admin dashboard.
+    
+    One row per day, divorce stage, dominant strategy and overall score,
+    kept up to date as results are saved (see _increment_rollups) and
+    rebuilt from assessment_results with rebuild_rollups().
+    """
+    __tablename__ = "assessment_rollups"
+    
+    day = Column(Date, primary_key=True)
+    divorce_stage = Column(String(100), primary_key=True, default='')
+    dominant_strategy = Column(String(1), primary_key=True, default='')
+    overall_score = Column(Float, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    legal_score_sum = Column(Float, nullable=False, default=0)
+    legal_score_count = Column(Integer, nullable=False, default=0)
+    emotional_score_sum = Column(Float, nullable=False, default=0)
+    emotional_score_count = Column(Integer, nullable=False, default=0)
+    financial_score_sum = Column(Float, nullable=False, default=0)
+    financial_score_count = Column(Integer, nullable=False, default=0)
+    children_score_sum = Column(Float, nullable=False, default=0)
+    children_score_count = Column(Integer, nullable=False, default=0)
+    recovery_score_sum = Column(Float, nullable=False, default=0)
+    recovery_score_count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<AssessmentRollup(day={self.day}, divorce_stage={self.divorce_stage}, dominant_strategy={self.dominant_strategy}, count={self.count})>"
+
+def add_missing_columns(lock_timeout=SCHEMA_LOCK_TIMEOUT):
+    """
+    Add model columns missing from tables that already exist.
+    
+    create_all only creates missing tables. New columns must be nullable
+    with no server default, so adding one only changes the catalog and
+    does not rewrite the table; existing rows are backfilled separately.
+    
+    Args:
+        lock_timeout: On PostgreSQL, give up on adding a column if its
+            table lock is not granted within this time, instead of queueing
+            every write to the table behind it. Retry when the table is quieter.
+    
+    Returns:
+        (changes, missing) tuple: descriptions of the columns added, and
+        "table.column" names that are still missing
+    """
+    changes = []
+    missing = []
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            try:
+                with engine.begin() as conn:
+                    if engine.dialect.name == 'postgresql':
+                        conn.execute(text(f"SET LOCAL lock_timeout = '{lock_timeout}'"))
+                        conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS {column.name} {column_type}"))
+                    else:
+                        conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                changes.append(f"added column {table.name}.{column.name}")
+            except Exception as e:
+                print(f"Error adding column {table.name}.{column.name}: {str(e)}")
+                missing.append(f"{table.name}.{column.name}")
+    return changes, missing
+
+def migrate_schema(lock_timeout=SCHEMA_LOCK_TIMEOUT):
+    """
+    Bring an existing database up to date with the models.
+    
+    Missing columns are also added on import (see add_missing_columns);
+    indexes can take a long time to build on a large table, so they are
+    only created here. Run it once per deploy with `python manage.py migrate`.
+    
+    Args:
+        lock_timeout: On PostgreSQL, give up on adding a column if its
+            table lock is not granted within this time. Re-run when the
+            table is quieter.
+    
+    Returns:
+        List of descriptions of the changes made
+    """
+    changes, _ = add_missing_columns(lock_timeout)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                if _create_index(index):
+                    changes.append(f"created index {index.name}")
+            except Exception as e:
+                print(f"Error creating index {index.name}: {str(e)}")
+    
+    # Rollups start empty on databases that predate them
+    try:
+        with engine.connect() as conn:
+            has_results = conn.execute(select(AssessmentResult.id).limit(1)).first() is not None
+            has_rollups = conn.execute(select(AssessmentRollup.day).limit(1)).first() is not None
+        if has_results and not has_rollups:
+            print("WARNING: assessment_rollups is empty; run `python manage.py rebuild-rollups` to backfill it")
+    except Exception as e:
+        print(f"Error checking assessment_rollups: {str(e)}")
+    
+    return changes
+
+def _create_index(index):
+    """
+    Create a model index if it does not exist yet.
+    
+    On PostgreSQL the index is built CONCURRENTLY so writes to the table
+    carry on while it builds. A concurrent build that was interrupted
+    leaves an invalid index behind; that is dropped and built again.
+    
+    Returns:
+        True if the index was created
+    """
+    if engine.dialect.name != 'postgresql':
+        if inspect(engine).has_index(index.table.name, index.name):
+            return False
+        index.create(bind=engine)
+        return True
+    
+    statement = str(CreateIndex(index).compile(dialect=engine.dialect))
+    statement = re.sub(r"^CREATE (UNIQUE )?INDEX ", r"CREATE \1INDEX CONCURRENTLY ", statement)
+    
+    # CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        valid = conn.execute(text(
+            "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name"
+        ), {'name': index.name}).scalar()
+        if valid:
+            return False
+        if valid is not None:
+            print(f"Rebuilding invalid index {index.name} left by an interrupted build")
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+        conn.execute(text(statement))
+    return True
+
+# Create any missing tables and columns, so saving works on a database
+# that predates them; indexes are built by migrate_schema (python manage.py
+# migrate). Writes would fail on every submission without the columns, so
+# refuse to start rather than run without them.
 Base.metadata.create_all(engine)
+_added_columns, _missing_columns = add_missing_columns()
+for _change in _added_columns:
+    print(f"Schema: {_change}")
+if _missing_columns:
+    raise RuntimeError(
+        f"Database is missing columns {', '.join(_missing_columns)} and they could not be added; "
+        "restart when the tables are less busy, or with a longer SCHEMA_LOCK_TIMEOUT"
+    )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Database interaction functions
-def save_assessment_result(email, scores, responses):
+def _assessment_row(email, scores, responses, submission_key=None, created_at=None):
+    """Build the assessment_results column values for one submission."""
+    responses = responses or {}
+    strategy_counts = scores.get('strategy_counts') or {}
+    return {
+        'email': email,
+        'age': responses.get('age', ''),
+        'divorce_stage': responses.get('divorce_stage', ''),
+        'overall_score': scores['overall'],
+        'legal_score': scores.get('legal'),
+        'emotional_score': scores.get('emotional'),
+        'financial_score': scores.get('financial'),
+        'children_score': scores.get('children'),
+        'recovery_score': scores.get('recovery'),
+        'responses': responses,
+        'dominant_strategy': scores.get('dominant_strategy'),
+        'g_count': strategy_counts.get('G'),
+        'b_count': strategy_counts.get('B'),
+        'c_count': strategy_counts.get('C'),
+        'h_count': strategy_counts.get('H'),
+        'submission_key': submission_key,
+        'created_at': created_at or datetime.datetime.utcnow()
+    }
+
+def save_assessment_result(email, scores, responses, refresh=True, submission_key=None, created_at=None):
     """
     Save assessment results to the database.
     
@@ -66,25 +294,30 @@ def save_assessment_result(email, scores, responses):
         email: User's email address
         scores: Dictionary of assessment scores
         responses: Dictionary of user responses
+        refresh: Reload and return the created object. Pass False to skip
+            the extra SELECT when only confirmation is needed.
+        submission_key: Optional idempotency key. If a result with this key
+            is already stored, nothing is written and that result is returned.
+        created_at: Optional original submission time (UTC), e.g. when
+            replaying a backup; defaults to now
     
     Returns:
-        AssessmentResult object that was created
+        AssessmentResult object that was created, or its id when refresh is False
     """
     db = SessionLocal()
     try:
+        row = _assessment_row(email, scores, responses, submission_key, created_at)
+        
+        # Dashboard rollups are updated in the same transaction as the insert
+        _increment_rollups(db, [row])
+        
+        if not refresh:
+            inserted = db.execute(insert(AssessmentResult.__table__).values(**row))
+            db.commit()
+            return inserted.inserted_primary_key[0]
+        
         # Create new assessment result
-        result = AssessmentResult(
-            email=email,
-            age=responses.get('age', ''),
-            divorce_stage=responses.get('divorce_stage', ''),
-            overall_score=scores['overall'],
-            legal_score=scores.get('legal'),
-            emotional_score=scores.get('emotional'),
-            financial_score=scores.get('financial'),
-            children_score=scores.get('children'),
-            recovery_score=scores.get('recovery'),
-            responses=responses
-        )
+        result = AssessmentResult(**row)
         
         # Add to session and commit
         db.add(result)
@@ -92,13 +325,129 @@ def save_assessment_result(email, scores, responses):
         db.refresh(result)
         
         return result
+    except IntegrityError as e:
+        db.rollback()
+        existing = _find_by_submission_key(db, AssessmentResult, submission_key)
+        if existing is None:
+            print(f"Error saving to database: {str(e)}")
+            DATABASE_ERRORS_TOTAL.inc(operation='save_assessment_result')
+            return None
+        print(f"Submission {submission_key} already saved as result {existing.id}")
+        return existing if refresh else existing.id
     except Exception as e:
         db.rollback()
         print(f"Error saving to database: {str(e)}")
+        DATABASE_ERRORS_TOTAL.inc(operation='save_assessment_result')
         return None
     finally:
         db.close()
 
+def _find_by_submission_key(db, model, submission_key):
+    if submission_key is None:
+        return None
+    return db.execute(select(model).where(model.submission_key == submission_key)).scalar_one_or_none()
+
+def is_submission_complete(submission_key):
+    """
+    Check whether a submission has already been fully processed.
+    
+    Queuing the results email is the last step of a submission, so an
+    outbox entry with the key means there is nothing left to do.
+    
+    Args:
+        submission_key: Idempotency key of the submission
+    
+    Returns:
+        True if the submission's email is already queued or sent
+    """
+    try:
+        with engine.connect() as conn:
+            return conn.execute(
+                select(EmailOutbox.id).where(EmailOutbox.submission_key == submission_key)
+            ).first() is not None
+    except Exception as e:
+        print(f"Error checking submission: {str(e)}")
+        DATABASE_ERRORS_TOTAL.inc(operation='is_submission_complete')
+        return False
+
+def save_assessment_results_bulk(submissions, chunk_size=1000):
+    """
+    Insert many assessment results, e.g. for imports or backup replays.
+    
+    Rows are written with COPY on PostgreSQL and multi-row INSERTs elsewhere,
+    one transaction per chunk. No objects are loaded back.
+    
+    Args:
+        submissions: Iterable of (email, scores, responses) tuples, optionally
+            with a fourth created_at element to keep the original submission time
+        chunk_size: Rows written per transaction
+    
+    Returns:
+        Number of rows inserted
+    """
+    inserted = 0
+    chunk = []
+    for submission in submissions:
+        email, scores, responses = submission[:3]
+        row = _assessment_row(email, scores, responses)
+        if len(submission) > 3 and submission[3] is not None:
+            row['created_at'] = submission[3]
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            inserted += _insert_rows(chunk)
+            chunk = []
+    if chunk:
+        inserted += _insert_rows(chunk)
+    return inserted
+
+_ASSESSMENT_COPY_COLUMNS = (
+    'email', 'age', 'divorce_stage', 'overall_score', 'legal_score', 'emotional_score',
+    'financial_score', 'children_score', 'recovery_score', 'responses',
+    'dominant_strategy', 'g_count', 'b_count', 'c_count', 'h_count', 'submission_key', 'created_at'
+)
+
+def _insert_rows(rows):
+    """Write prepared assessment rows and their rollup increments in one transaction."""
+    with engine.begin() as conn:
+        if engine.dialect.name == 'postgresql':
+            _copy_rows(conn, rows)
+        else:
+            conn.execute(insert(AssessmentResult.__table__), rows)
+        _increment_rollups(conn, rows)
+    return len(rows)
+
+def _copy_value(value):
+    """Format a value for PostgreSQL COPY text format."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, dict):
+        value = json.dumps(value)
+    elif isinstance(value, datetime.datetime):
+        value = value.isoformat()
+    else:
+        value = str(value)
+    return (value.replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+def _copy_rows(conn, rows):
+    """Stream rows into assessment_results with COPY on the given connection."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(_copy_value(row[column]) for column in _ASSESSMENT_COPY_COLUMNS))
+        buffer.write('\n')
+    buffer.seek(0)
+    
+    statement = f"COPY assessment_results ({', '.join(_ASSESSMENT_COPY_COLUMNS)}) FROM STDIN"
+    cursor = conn.connection.cursor()
+    try:
+        if hasattr(cursor, 'copy_expert'):
+            cursor.copy_expert(statement, buffer)  # psycopg2
+        else:
+            with cursor.copy(statement) as copy:  # psycopg 3
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
 def get_assessment_results(email=None, limit=100):
     """
     Retrieve assessment results from the database.
@@ -116,12 +465,691 @@ def get_assessment_results(email=None, limit=100):
         
         if email:
             query = query.filter(AssessmentResult.email == email)
-            
+        
         results = query.order_by(AssessmentResult.created_at.desc()).limit(limit).all()
         
         return results
     except Exception as e:
         print(f"Error retrieving from database: {str(e)}")
+        DATABASE_ERRORS_TOTAL.inc(operation='get_assessment_results')
         return []
     finally:
         db.close()
+
+
+def iter_assessment_results(after_id=None, batch_size=1000, columns=None, email=None):
+    """
+    Stream assessment results in id order using keyset pagination.
+    
+    Each page is fetched with a server-side cursor in its own short-lived
+    session, so walking the whole table uses constant memory.
+    
+    Args:
+        after_id: Only yield results with an id greater than this
+        batch_size: Rows fetched per page
+        columns: Optional list of column names to load; the full ORM objects
+            (including the responses JSON) are loaded when omitted. 'id' is
+            always included because pagination depends on it.
+        email: Optional filter by email
+    
+    Yields:
+        AssessmentResult objects, or rows with the requested columns as attributes
+    """
+    if columns:
+        names = ['id'] + [name for name in columns if name != 'id']
+        unknown = [name for name in names if name not in AssessmentResult.__table__.columns]
+        if unknown:
+            raise ValueError(f"Unknown assessment_results columns: {', '.join(unknown)}")
+        entities = [getattr(AssessmentResult, name) for name in names]
+    else:
+        entities = [AssessmentResult]
+    
+    last_id = after_id
+    while True:
+        db = SessionLocal()
+        try:
+            query = db.query(*entities)
+            if last_id is not None:
+                query = query.filter(AssessmentResult.id > last_id)
+            if email:
+                query = query.filter(AssessmentResult.email == email)
+            query = query.order_by(AssessmentResult.id).limit(batch_size)
+            query = query.execution_options(stream_results=True).yield_per(batch_size)
+            
+            fetched = 0
+            for row in query:
+                fetched += 1
+                last_id = row.id
+                yield row
+        finally:
+            db.close()
+        
+        if fetched < batch_size:
+            return
+
+def count_assessment_results():
+    """Return the total number of assessment results, or 0 on error."""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(func.count()).select_from(AssessmentResult.__table__)).scalar()
+    except Exception as e:
+        print(f"Error counting assessment results: {str(e)}")
+        DATABASE_ERRORS_TOTAL.inc(operation='count_assessment_results')
+        return 0
+
+def get_data_version():
+    """
+    Return a cheap marker that changes whenever a result is saved.
+    
+    Uses max(id), which is answered from the primary key index, so callers
+    can key caches on it without scanning assessment_results.
+    
+    Returns:
+        Highest assessment_results id, 0 if the table is empty, or None on error
+    """
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(func.max(AssessmentResult.id))).scalar() or 0
+    except Exception as e:
+        print(f"Error reading data version: {str(e)}")
+        DATABASE_ERRORS_TOTAL.inc(operation='get_data_version')
+        return None
+
+# Columns the admin dashboard loads into DataFrames (everything but the responses JSON)
+RESULT_FRAME_COLUMNS = (
+    'id', 'email', 'age', 'divorce_stage', 'overall_score', 'legal_score', 'emotional_score',
+    'financial_score', 'children_score', 'recovery_score', 'dominant_strategy',
+    'g_count', 'b_count', 'c_count', 'h_count', 'created_at'
+)
+
+def load_results_frame(columns=RESULT_FRAME_COLUMNS, since=None, until=None, limit=None, dtype_backend=None):
+    """
+    Load assessment results straight into a pandas DataFrame.
+    
+    Runs one projected query and builds the frame from the cursor without
+    creating ORM objects. The responses JSON column cannot be requested.
+    
+    Args:
+        columns: Column names to load
+        since: Optional inclusive lower bound on created_at
+        until: Optional exclusive upper bound on created_at
+        limit: Optional maximum number of rows (newest first)
+        dtype_backend: Passed to pandas, e.g. 'pyarrow' for Arrow-backed dtypes
+    
+    Returns:
+        DataFrame with one column per requested name, newest rows first
+    """
+    import pandas as pd
+    
+    table = AssessmentResult.__table__
+    unknown = [name for name in columns if name not in table.columns or name == 'responses']
+    if unknown:
+        raise ValueError(f"Cannot load assessment_results columns: {', '.join(unknown)}")
+    
+    statement = select(*[table.c[name] for name in columns])
+    if since is not None:
+        statement = statement.where(table.c.created_at >= since)
+    if until is not None:
+        statement = statement.where(table.c.created_at < until)
+    statement = statement.order_by(table.c.created_at.desc())
+    if limit is not None:
+        statement = statement.limit(limit)
+    
+    read_options = {'parse_dates': ['created_at']} if 'created_at' in columns else {}
+    if dtype_backend:
+        read_options['dtype_backend'] = dtype_backend
+    
+    try:
+        with engine.connect() as conn:
+            return pd.read_sql(statement, conn, **read_options)
+    except Exception as e:
+        print(f"Error retrieving from database: {str(e)}")
+        DATABASE_ERRORS_TOTAL.inc(operation='load_results_frame')
+        return pd.DataFrame(columns=list(columns))
+
+CATEGORY_SCORE_COLUMNS = ('legal_score', 'emotional_score', 'financial_score', 'children_score', 'recovery_score')
+
+def aggregate_metrics(histogram_bins=20, recent_days=7):
+    """
+    Compute the admin dashboard metrics over the full table in SQL.
+    
+    Args:
+        histogram_bins: Number of equal-width overall_score bins
+        recent_days: Window for the recent submissions count
+    
+    Returns:
+        Dictionary with:
+            total: Number of assessments
+            average_overall_score: Mean overall_score (None if empty)
+            recent_count: Assessments created in the last recent_days days
+            category_means: Mean of each category score column (None if no values)
+            score_histogram: List of (bin_start, bin_end, count) for non-empty bins
+            stage_counts: List of (divorce_stage, count), most common first
+            strategy_counts: List of (dominant_strategy, count)
+    """
+    table = AssessmentResult.__table__
+    recent_since = datetime.datetime.utcnow() - datetime.timedelta(days=recent_days)
+    
+    metrics = {
+        'total': 0,
+        'average_overall_score': None,
+        'recent_count': 0,
+        'category_means': {name: None for name in CATEGORY_SCORE_COLUMNS},
+        'score_histogram': [],
+        'stage_counts': [],
+        'strategy_counts': []
+    }
+    
+    try:
+        with engine.connect() as conn:
+            summary = conn.execute(select(
+                func.count(),
+                func.avg(table.c.overall_score),
+                func.min(table.c.overall_score),
+                func.max(table.c.overall_score),
+                func.count().filter(table.c.created_at > recent_since),
+                *[func.avg(table.c[name]) for name in CATEGORY_SCORE_COLUMNS]
+            )).one()
+            
+            total, average, low, high, recent = summary[:5]
+            metrics['total'] = total
+            metrics['average_overall_score'] = float(average) if average is not None else None
+            metrics['recent_count'] = recent or 0
+            metrics['category_means'] = {
+                name: float(mean) if mean is not None else None
+                for name, mean in zip(CATEGORY_SCORE_COLUMNS, summary[5:])
+            }
+            
+            if total:
+                metrics['score_histogram'] = _score_histogram(conn, float(low), float(high), histogram_bins)
+            
+            stage_rows = conn.execute(
+                select(table.c.divorce_stage, func.count().label('count'))
+                .where(table.c.divorce_stage.isnot(None))
+                .group_by(table.c.divorce_stage)
+                .order_by(func.count().desc())
+            ).all()
+            metrics['stage_counts'] = [(stage, count) for stage, count in stage_rows]
+            
+            strategy_rows = conn.execute(
+                select(table.c.dominant_strategy, func.count())
+                .where(table.c.dominant_strategy.isnot(None))
+                .group_by(table.c.dominant_strategy)
+                .order_by(table.c.dominant_strategy)
+            ).all()
+            metrics['strategy_counts'] = [(strategy, count) for strategy, count in strategy_rows]
+    except Exception as e:
+        print(f"Error aggregating metrics: {str(e)}")
+        DATABASE_ERRORS_TOTAL.inc(operation='aggregate_metrics')
+    
+    return metrics
+
+def _score_histogram(conn, low, high, bins):
+    """Count overall_score values in equal-width bins between low and high."""
+    table = AssessmentResult.__table__
+    width = (high - low) / bins if high > low else 1.0
+    
+    if engine.dialect.name == 'postgresql':
+        # width_bucket puts the maximum in bucket bins + 1; fold it into the last bin
+        bucket = func.least(func.width_bucket(table.c.overall_score, low, low + width * bins, bins), bins) - 1
+    else:
+        raw = cast((table.c.overall_score - low) / width, Integer)
+        bucket = case((raw >= bins, bins - 1), else_=raw)
+    bucket = bucket.label('bucket')
+    
+    rows = conn.execute(
+        select(bucket, func.count()).where(table.c.overall_score.isnot(None)).group_by(bucket).order_by(bucket)
+    ).all()
+    return [(low + index * width, low + (index + 1) * width, count) for index, count in rows]
+
+# Rollup maintenance. Each saved result adds to the matching
+# assessment_rollups row so the dashboard never scans assessment_results.
+_ROLLUP_KEY_COLUMNS = ('day', 'divorce_stage', 'dominant_strategy', 'overall_score')
+_ROLLUP_VALUE_COLUMNS = ('count',) + tuple(
+    f"{name}_{suffix}" for name in CATEGORY_SCORE_COLUMNS for suffix in ('sum', 'count')
+)
+
+def _rollup_deltas(rows, deltas=None):
+    """
+    Accumulate rollup increments for prepared rows.
+    
+    Args:
+        rows: Iterable of assessment_results column dicts
+        deltas: Optional dict to accumulate into
+    
+    Returns:
+        Dict mapping rollup key tuples to dicts of increments
+    """
+    if deltas is None:
+        deltas = {}
+    for row in rows:
+        key = (
+            row['created_at'].date(),
+            row['divorce_stage'] or '',
+            row['dominant_strategy'] or '',
+            float(row['overall_score'])
+        )
+        delta = deltas.get(key)
+        if delta is None:
+            delta = deltas[key] = dict.fromkeys(_ROLLUP_VALUE_COLUMNS, 0)
+        delta['count'] += 1
+        for name in CATEGORY_SCORE_COLUMNS:
+            value = row.get(name)
+            if value is not None:
+                delta[f"{name}_sum"] += value
+                delta[f"{name}_count"] += 1
+    return deltas
+
+def _rollup_values(deltas):
+    return [dict(zip(_ROLLUP_KEY_COLUMNS, key), **delta) for key, delta in deltas.items()]
+
+def _increment_rollups(executor, rows):
+    """
+    Add prepared rows to assessment_rollups using the caller's transaction.
+    
+    Args:
+        executor: Session or Connection the rows are being inserted with
+        rows: List of assessment_results column dicts
+    """
+    values = _rollup_values(_rollup_deltas(rows))
+    if not values:
+        return
+    
+    table = AssessmentRollup.__table__
+    dialect = engine.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        statement = (postgresql.insert if dialect == 'postgresql' else sqlite.insert)(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(_ROLLUP_KEY_COLUMNS),
+            set_={name: table.c[name] + statement.excluded[name] for name in _ROLLUP_VALUE_COLUMNS}
+        )
+        executor.execute(statement, values)
+        return
+    
+    # Other databases: update the existing row, insert it if there was none
+    for value in values:
+        result = executor.execute(
+            update(table)
+            .where(*[table.c[name] == value[name] for name in _ROLLUP_KEY_COLUMNS])
+            .values({name: table.c[name] + value[name] for name in _ROLLUP_VALUE_COLUMNS})
+        )
+        if result.rowcount == 0:
+            executor.execute(insert(table).values(**value))
+
+def backfill_strategy_columns(batch_size=1000):
+    """
+    Fill dominant_strategy and the per-strategy counts for older rows.
+    
+    Rows saved before these columns existed are re-scored from their
+    responses in batches, each written in its own transaction, so the job
+    can be interrupted and resumed.
+    
+    Args:
+        batch_size: Rows re-scored per batch
+    
+    Returns:
+        Number of rows updated
+    """
+    # Only needed for backfills, so not imported on the submit path
+    from analyzer import calculate_scores_batch
+    
+    table = AssessmentResult.__table__
+    statement = update(table).where(table.c.id == bindparam('row_id')).values(
+        dominant_strategy=bindparam('new_dominant_strategy'),
+        g_count=bindparam('new_g_count'),
+        b_count=bindparam('new_b_count'),
+        c_count=bindparam('new_c_count'),
+        h_count=bindparam('new_h_count')
+    )
+    
+    updated = 0
+    last_id = None
+    while True:
+        query = select(table.c.id, table.c.responses).where(table.c.dominant_strategy.is_(None))
+        if last_id is not None:
+            query = query.where(table.c.id > last_id)
+        with engine.connect() as conn:
+            rows = conn.execute(query.order_by(table.c.id).limit(batch_size)).all()
+        if not rows:
+            return updated
+        
+        scores = calculate_scores_batch(row.responses for row in rows)
+        with engine.begin() as conn:
+            conn.execute(statement, [
+                {
+                    'row_id': row.id,
+                    'new_dominant_strategy': score['dominant_strategy'],
+                    'new_g_count': score['strategy_counts']['G'],
+                    'new_b_count': score['strategy_counts']['B'],
+                    'new_c_count': score['strategy_counts']['C'],
+                    'new_h_count': score['strategy_counts']['H']
+                }
+                for row, score in zip(rows, scores)
+            ])
+        
+        updated += len(rows)
+        last_id = rows[-1].id
+
+def rebuild_rollups(batch_size=5000):
+    """
+    Recompute assessment_rollups from assessment_results.
+    
+    Backfills the rollups for existing data, after filling any missing
+    strategy columns. The scan, delete and insert run in one transaction
+    that holds the rollup table's write lock, so results saved meanwhile
+    wait and are then added on top instead of being lost. The dashboard
+    can still read the old rollups during the rebuild.
+    
+    Args:
+        batch_size: Rows fetched per round trip during the scan
+    
+    Returns:
+        Number of assessment results counted
+    """
+    backfill_strategy_columns()
+    
+    results = AssessmentResult.__table__
+    rollups = AssessmentRollup.__table__
+    columns = ['created_at', 'divorce_stage', 'overall_score', 'dominant_strategy'] + list(CATEGORY_SCORE_COLUMNS)
+    deltas = {}
+    counted = 0
+    with engine.begin() as conn:
+        if engine.dialect.name == 'postgresql':
+            # Blocks the increments made by concurrent saves, but not reads
+            conn.execute(text(f"LOCK TABLE {rollups.name} IN EXCLUSIVE MODE"))
+        # Elsewhere the delete itself takes the write lock (on SQLite, the
+        # whole database's), so it comes before the scan
+        conn.execute(delete(rollups))
+        
+        # Scanned on the locked connection, so every save committed before
+        # the lock is counted and every later one waits for the commit
+        rows = conn.execute(
+            select(*[results.c[name] for name in columns])
+            .where(results.c.created_at.isnot(None), results.c.overall_score.isnot(None))
+            .execution_options(yield_per=batch_size)
+        )
+        for row in rows:
+            _rollup_deltas([row._asdict()], deltas)
+            counted += 1
+        
+        values = _rollup_values(deltas)
+        if values:
+            conn.execute(insert(rollups), values)
+    
+    return counted
+
+def rollup_metrics(histogram_bins=20, recent_days=7):
+    """
+    Read the admin dashboard metrics from assessment_rollups.
+    
+    Returns the same structure as aggregate_metrics, but only touches the
+    small rollup table (plus an indexed count of the results saved on
+    the first, partial day of the recent window). Results without a
+    divorce stage are counted under ''.
+    
+    Args:
+        histogram_bins: Number of equal-width overall_score bins
+        recent_days: Window for the recent submissions count
+    
+    Returns:
+        Dictionary with total, average_overall_score, recent_count,
+        category_means, score_histogram, stage_counts and strategy_counts
+    """
+    table = AssessmentRollup.__table__
+    results = AssessmentResult.__table__
+    recent_since = datetime.datetime.utcnow() - datetime.timedelta(days=recent_days)
+    # Whole days after recent_since come from the rollups; the rest of
+    # its day is counted from assessment_results
+    first_full_day = recent_since.date() + datetime.timedelta(days=1)
+    
+    metrics = {
+        'total': 0,
+        'average_overall_score': None,
+        'recent_count': 0,
+        'category_means': {name: None for name in CATEGORY_SCORE_COLUMNS},
+        'score_histogram': [],
+        'stage_counts': [],
+        'strategy_counts': []
+    }
+    
+    try:
+        with engine.connect() as conn:
+            summary = conn.execute(select(
+                func.sum(table.c.count),
+                func.sum(table.c.count * table.c.overall_score),
+                func.sum(table.c.count).filter(table.c.day >= first_full_day),
+                *[func.sum(table.c[f"{name}_{suffix}"]) for name in CATEGORY_SCORE_COLUMNS for suffix in ('sum', 'count')]
+            )).one()
+            
+            total, score_sum, recent = summary[:3]
+            if not total:
+                return metrics
+            
+            metrics['total'] = int(total)
+            metrics['average_overall_score'] = float(score_sum) / total
+            partial_day = conn.execute(
+                select(func.count()).select_from(results).where(
+                    results.c.created_at > recent_since,
+                    results.c.created_at < datetime.datetime.combine(first_full_day, datetime.time.min),
+                    results.c.overall_score.isnot(None)
+                )
+            ).scalar()
+            metrics['recent_count'] = int(recent or 0) + partial_day
+            category_totals = summary[3:]
+            metrics['category_means'] = {
+                name: float(category_totals[2 * index]) / category_totals[2 * index + 1]
+                if category_totals[2 * index + 1] else None
+                for index, name in enumerate(CATEGORY_SCORE_COLUMNS)
+            }
+            
+            score_counts = conn.execute(
+                select(table.c.overall_score, func.sum(table.c.count))
+                .group_by(table.c.overall_score)
+                .order_by(table.c.overall_score)
+            ).all()
+            metrics['score_histogram'] = _bin_score_counts(score_counts, histogram_bins)
+            
+            stage_count = func.sum(table.c.count)
+            stage_rows = conn.execute(
+                select(table.c.divorce_stage, stage_count)
+                .group_by(table.c.divorce_stage)
+                .order_by(stage_count.desc())
+            ).all()
+            metrics['stage_counts'] = [(stage, int(count)) for stage, count in stage_rows]
+            
+            strategy_rows = conn.execute(
+                select(table.c.dominant_strategy, func.sum(table.c.count))
+                .where(table.c.dominant_strategy != '')
+                .group_by(table.c.dominant_strategy)
+                .order_by(table.c.dominant_strategy)
+            ).all()
+            metrics['strategy_counts'] = [(strategy, int(count)) for strategy, count in strategy_rows]
+    except Exception as e:
+        print(f"Error reading rollup metrics: {str(e)}")
+        DATABASE_ERRORS_TOTAL.inc(operation='rollup_metrics')
+    
+    return metrics
+
+def _bin_score_counts(score_counts, bins):
+    """Bin (score, count) pairs the same way _score_histogram does in SQL."""
+    if not score_counts:
+        return []
+    low = float(score_counts[0][0])
+    high = float(score_counts[-1][0])
+    width = (high - low) / bins if high > low else 1.0
+    
+    binned = {}
+    for score, count in score_counts:
+        index = min(int((float(score) - low) / width), bins - 1)
+        binned[index] = binned.get(index, 0) + int(count)
+    return [(low + index * width, low + (index + 1) * width, count) for index, count in sorted(binned.items())]
+
+def enqueue_email(recipient_email, html_content, scores, responses=None, submission_key=None, replayed=False):
+    """
+    Add a results email to the outbox for background delivery.
+    
+    Args:
+        recipient_email: User's email address
+        html_content: HTML content for the email body
+        scores: Dictionary of assessment scores
+        responses: Optional dictionary of user responses
+        submission_key: Optional idempotency key. If an email with this key
+            is already queued, no new entry is added.
+        replayed: The email is being re-sent from the backup log, so the
+            worker does not back it up again
+    
+    Returns:
+        ID of the outbox entry, or None if it could not be stored
+    """
+    db = SessionLocal()
+    try:
+        entry = EmailOutbox(
+            recipient_email=recipient_email,
+            html_content=html_content,
+            scores=scores,
+            responses=responses,
+            submission_key=submission_key,
+            replayed=replayed
+        )
+        db.add(entry)
+        db.commit()
+        return entry.id
+    except IntegrityError as e:
+        db.rollback()
+        existing = _find_by_submission_key(db, EmailOutbox, submission_key)
+        if existing is None:
+            print(f"Error adding email to outbox: {str(e)}")
+            DATABASE_ERRORS_TOTAL.inc(operation='enqueue_email')
+            return None
+        return existing.id
+    except Exception as e:
+        db.rollback()
+        print(f"Error adding email to outbox: {str(e)}")
+        DATABASE_ERRORS_TOTAL.inc(operation='enqueue_email')
+        return None
+    finally:
+        db.close()
+
+def claim_due_emails(limit=10, lease_seconds=300, max_attempts=None, ids=None):
+    """
+    Claim outbox entries that are due for a delivery attempt.
+    
+    Claimed entries are marked 'sending' with a lease; if the worker dies
+    before reporting back, they become due again once the lease expires.
+    Reclaiming an expired lease counts the interrupted attempt, so a
+    message that keeps crashing the worker eventually fails instead of
+    being retried forever.
+    
+    Each claim is a conditional update on the entry's previous status and
+    due time, so two workers can never claim the same entry, even on
+    databases without SKIP LOCKED.
+    
+    Args:
+        limit: Maximum number of entries to claim
+        lease_seconds: How long the claim is held before it can be retried
+        max_attempts: Mark an entry failed instead of reclaiming it once its
+            attempts reach this number (None for no limit)
+        ids: Only claim entries with these IDs (None for any due entry)
+    
+    Returns:
+        List of dicts with id, recipient_email, html_content, scores,
+        responses, attempts, submission_key and replayed
+    """
+    table = EmailOutbox.__table__
+    try:
+        with engine.begin() as conn:
+            now = datetime.datetime.utcnow()
+            query = select(table).where(
+                or_(table.c.status == 'pending', table.c.status == 'sending'),
+                table.c.next_attempt_at <= now
+            ).order_by(table.c.next_attempt_at).limit(limit)
+            if ids is not None:
+                query = query.where(table.c.id.in_(ids))
+            
+            if engine.dialect.name == 'postgresql':
+                # Let several workers drain the outbox without blocking each other
+                query = query.with_for_update(skip_locked=True)
+            
+            claimed = []
+            for entry in conn.execute(query).mappings().all():
+                attempts = entry['attempts']
+                values = {'status': 'sending', 'next_attempt_at': now + datetime.timedelta(seconds=lease_seconds)}
+                if entry['status'] == 'sending':
+                    # The previous claim's lease expired without a result
+                    attempts += 1
+                    values['attempts'] = attempts
+                    values['last_error'] = 'Delivery attempt did not finish before its lease expired'
+                    if max_attempts is not None and attempts >= max_attempts:
+                        values['status'] = 'failed'
+                
+                result = conn.execute(
+                    update(table).where(
+                        table.c.id == entry['id'],
+                        table.c.status == entry['status'],
+                        table.c.next_attempt_at == entry['next_attempt_at']
+                    ).values(**values)
+                )
+                if result.rowcount != 1 or values['status'] == 'failed':
+                    # Claimed by another worker first, or given up on
+                    continue
+                
+                claimed.append({
+                    'id': entry['id'],
+                    'recipient_email': entry['recipient_email'],
+                    'html_content': entry['html_content'],
+                    'scores': entry['scores'],
+                    'responses': entry['responses'],
+                    'attempts': attempts,
+                    'submission_key': entry['submission_key'],
+                    'replayed': bool(entry['replayed'])
+                })
+            
+            return claimed
+    except Exception as e:
+        print(f"Error claiming emails from outbox: {str(e)}")
+        DATABASE_ERRORS_TOTAL.inc(operation='claim_due_emails')
+        return []
+
+def mark_email_sent(entry_id):
+    """Mark an outbox entry as delivered."""
+    _update_outbox_entry(entry_id, status='sent', sent_at=datetime.datetime.utcnow(), last_error=None)
+
+def mark_email_retry(entry_id, attempts, error, next_attempt_at):
+    """Record a failed delivery attempt and schedule the next one."""
+    _update_outbox_entry(
+        entry_id,
+        status='pending',
+        attempts=attempts,
+        last_error=error,
+        next_attempt_at=next_attempt_at
+    )
+
+def mark_email_failed(entry_id, attempts, error):
+    """Give up on an outbox entry after too many failed attempts."""
+    _update_outbox_entry(entry_id, status='failed', attempts=attempts, last_error=error)
+
+def count_pending_emails():
+    """Return the number of outbox entries still waiting for delivery."""
+    db = SessionLocal()
+    try:
+        return db.query(EmailOutbox).filter(
+            or_(EmailOutbox.status == 'pending', EmailOutbox.status == 'sending')
+        ).count()
+    except Exception as e:
+        print(f"Error counting outbox entries: {str(e)}")
+        DATABASE_ERRORS_TOTAL.inc(operation='count_pending_emails')
+        return 0
+    finally:
+        db.close()
+
+def _update_outbox_entry(entry_id, **values):
+    db = SessionLocal()
+    try:
+        db.query(EmailOutbox).filter(EmailOutbox.id == entry_id).update(values, synchronize_session=False)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error updating outbox entry {entry_id}: {str(e)}")
+        DATABASE_ERRORS_TOTAL.inc(operation='update_outbox_entry')
+    finally:
+        db.close()
@@ -0,0 +1,142 @@
+import os
+import random
+import threading
+import datetime
+import logging
+import traceback
+from typing import Dict, Any, Optional
+
+import database
+from email_sender import save_email_backup, send_many, send_results_email
+from metrics import start_exporters
+
+# Retry policy for outbox deliveries
+MAX_ATTEMPTS = int(os.environ.get("EMAIL_MAX_ATTEMPTS", "8"))
+BACKOFF_BASE_SECONDS = float(os.environ.get("EMAIL_BACKOFF_BASE_SECONDS", "5"))
+BACKOFF_MAX_SECONDS = float(os.environ.get("EMAIL_BACKOFF_MAX_SECONDS", "900"))
+POLL_INTERVAL_SECONDS = float(os.environ.get("EMAIL_POLL_INTERVAL_SECONDS", "5"))
+
+logger = logging.getLogger("email_queue")
+
+_worker = None
+_worker_lock = threading.Lock()
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter for the given number of failed attempts."""
+    delay = min(BACKOFF_BASE_SECONDS * (2 ** (attempts - 1)), BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+class EmailWorker(threading.Thread):
+    """Background thread that drains the email outbox."""
+    
+    def __init__(self, poll_interval: float = POLL_INTERVAL_SECONDS, batch_size: int = 10):
+        super().__init__(name="email-outbox-worker", daemon=True)
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+    
+    def wake(self):
+        """Process the outbox now instead of waiting for the next poll."""
+        self._wake.set()
+    
+    def stop(self):
+        self._stopping.set()
+        self._wake.set()
+    
+    def run(self):
+        while not self._stopping.is_set():
+            self._wake.clear()
+            try:
+                processed = self.process_due()
+            except Exception as e:
+                logger.error(f"Email worker error: {str(e)}")
+                logger.error(traceback.format_exc())
+                processed = 0
+            
+            # Keep draining while there is a full batch of work
+            if processed < self.batch_size:
+                self._wake.wait(self.poll_interval)
+    
+    def process_due(self, ids: Optional[list] = None) -> int:
+        """
+        Attempt delivery of every due outbox entry. Returns how many were claimed.
+        
+        Args:
+            ids: Only deliver entries with these IDs (None for all due entries)
+        """
+        entries = database.claim_due_emails(limit=self.batch_size, max_attempts=MAX_ATTEMPTS, ids=ids)
+        if not entries:
+            return 0
+        
+        # Back up once, on the first attempt, as send_results_email would;
+        # entries replayed from the backup log are already in it
+        for entry in entries:
+            if entry['attempts'] == 0 and not entry['replayed']:
+                save_email_backup(entry['recipient_email'], entry['html_content'], entry['scores'] or {},
+                                  entry['responses'], entry['submission_key'])
+        
+        # Deliver the whole batch over one pooled SMTP session
+        errors = send_many([(entry['recipient_email'], entry['html_content']) for entry in entries])
+        for entry, error in zip(entries, errors):
+            self.record_result(entry, error)
+        return len(entries)
+    
+    def record_result(self, entry: Dict[str, Any], error: Optional[Exception]) -> None:
+        if error is None:
+            database.mark_email_sent(entry['id'])
+            return
+        
+        attempts = entry['attempts'] + 1
+        error = str(error)
+        if attempts >= MAX_ATTEMPTS:
+            logger.error(f"Giving up on email to {entry['recipient_email']} after {attempts} attempts: {error}")
+            database.mark_email_failed(entry['id'], attempts, error)
+        else:
+            delay = retry_delay(attempts)
+            logger.warning(f"Email to {entry['recipient_email']} failed (attempt {attempts}), retrying in {delay:.0f}s: {error}")
+            next_attempt_at = datetime.datetime.utcnow() + datetime.timedelta(seconds=delay)
+            database.mark_email_retry(entry['id'], attempts, error, next_attempt_at)
+
+def start_worker() -> EmailWorker:
+    """Start the outbox worker for this process if it is not already running."""
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = EmailWorker()
+            _worker.start()
+        return _worker
+
+def queue_results_email(recipient_email: str, html_content: str, scores: Dict[str, Any],
+                        responses: Optional[Dict[str, Any]] = None,
+                        submission_key: Optional[str] = None) -> bool:
+    """
+    Queue assessment results for background delivery.
+    
+    Falls back to sending synchronously if the outbox cannot be written.
+    
+    Args:
+        recipient_email: User's email address
+        html_content: HTML content for the email body
+        scores: Dictionary of assessment scores
+        responses: Optional dictionary of user responses
+        submission_key: Optional idempotency key; a submission is queued once
+    
+    Returns:
+        Boolean indicating success or failure
+    """
+    entry_id = database.enqueue_email(recipient_email, html_content, scores, responses, submission_key)
+    if entry_id is None:
+        logger.warning("Outbox unavailable - sending email synchronously")
+        return send_results_email(recipient_email, html_content, scores, responses, submission_key)
+    
+    start_worker().wake()
+    return True
+
+if __name__ == "__main__":
+    # Run a standalone worker process: python email_queue.py
+    logging.basicConfig(level=logging.INFO)
+    start_exporters()
+    worker = EmailWorker()
+    logger.info("Email outbox worker started")
+    worker.run()
@@ -3,13 +3,285 @@ import smtplib
 import ssl
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from email.mime.nonmultipart import MIMENonMultipart
+from email import encoders
 import logging
-from typing import Dict, Any, Union
-import json
-import datetime
+from typing import Dict, Any, Union, Iterable, List, Optional, Tuple
 import traceback
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from backup_log import record_email_backup
+from metrics import EMAILS_SENT_TOTAL, SMTP_FAILURES_TOTAL
 
-def send_results_email(recipient_email: str, html_content: str, scores: Dict[str, Any]) -> bool:
+def save_email_backup(recipient_email: str, html_content: str, scores: Dict[str, Any],
+                      responses: Optional[Dict[str, Any]] = None,
+                      submission_key: Optional[str] = None) -> None:
+    """
+    Save the report HTML and scores locally as a backup.
+    
+    The record is queued for the append-only backup log (see backup_log),
+    which compresses and fsyncs it on a background thread.
+    
+    Args:
+        recipient_email: User's email address
+        html_content: HTML content for the email body
+        scores: Dictionary of assessment scores
+        responses: Optional dictionary of user responses
+        submission_key: Optional idempotency key of the submission
+    """
+    logger = logging.getLogger("email_sender")
+    
+    try:
+        record_email_backup(recipient_email, html_content, scores, responses, submission_key)
+    except Exception as file_error:
+        logger.error(f"Could not save email content to backup log: {str(file_error)}")
+
+class SMTPConnectionPool:
+    """
+    Thread-safe pool of authenticated SMTP sessions.
+    
+    Connections are reused across sends so the TLS handshake and login are
+    paid once per connection instead of once per message. Idle connections
+    are closed after idle_timeout seconds, checked with NOOP before reuse,
+    and replaced transparently when the server has dropped them.
+    """
+    
+    def __init__(self, host: str, port: int, username: str, password: str,
+                 size: int = 4, idle_timeout: float = 60.0, health_check_after: float = 5.0,
+                 use_tls: bool = True, timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self._idle = deque()  # (connection, last_used) pairs
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._logger = logging.getLogger("email_sender")
+    
+    def _connect(self) -> smtplib.SMTP:
+        self._logger.info(f"Opening SMTP connection to {self.host}:{self.port}")
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls(context=ssl.create_default_context())
+            if self.username:
+                server.login(self.username, self.password)
+        except Exception:
+            self._close(server)
+            raise
+        return server
+    
+    @staticmethod
+    def _close(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+    
+    def _is_healthy(self, server: smtplib.SMTP) -> bool:
+        try:
+            return server.noop()[0] == 250
+        except Exception:
+            return False
+    
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                server, last_used = self._idle.pop()
+            
+            idle_for = time.monotonic() - last_used
+            if idle_for > self.idle_timeout:
+                self._close(server)
+                continue
+            if idle_for > self.health_check_after and not self._is_healthy(server):
+                self._close(server)
+                continue
+            return server
+        
+        return self._connect()
+    
+    def _checkin(self, server: smtplib.SMTP) -> None:
+        with self._lock:
+            self._idle.append((server, time.monotonic()))
+    
+    @contextmanager
+    def connection(self):
+        """Borrow an authenticated connection; it is discarded if the block raises."""
+        self._slots.acquire()
+        try:
+            server = self._checkout()
+            try:
+                yield server
+            except Exception:
+                self._close(server)
+                raise
+            self._checkin(server)
+        finally:
+            self._slots.release()
+    
+    def send(self, message: MIMEMultipart) -> None:
+        """Send a single message, reconnecting once if the pooled session was dropped."""
+        errors = self.send_many([message])
+        if errors[0] is not None:
+            raise errors[0]
+    
+    def send_many(self, messages: Iterable[MIMEMultipart]) -> List[Optional[Exception]]:
+        """
+        Send several messages over one authenticated session.
+        
+        Returns:
+            One entry per message: None on success, or the exception raised
+        """
+        messages = list(messages)
+        errors = [None] * len(messages)
+        index = 0
+        retried = -1
+        while index < len(messages):
+            connected = False
+            try:
+                with self.connection() as server:
+                    connected = True
+                    while index < len(messages):
+                        try:
+                            server.send_message(messages[index])
+                        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+                            # Rejected message; the session itself is still usable
+                            errors[index] = e
+                        index += 1
+            except Exception as e:
+                if connected and isinstance(e, OSError) and retried != index:
+                    # Session dropped mid-batch: retry this message once on a fresh connection
+                    retried = index
+                    continue
+                if not connected:
+                    # Could not connect or log in; every remaining message fails the same way
+                    errors[index:] = [e] * (len(messages) - index)
+                    break
+                errors[index] = e
+                index += 1
+        return errors
+    
+    def close(self) -> None:
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for server, _ in idle:
+            self._close(server)
+
+_smtp_pool = None
+_smtp_pool_lock = threading.Lock()
+
+def get_smtp_pool() -> Optional[SMTPConnectionPool]:
+    """
+    Return the process-wide SMTP pool configured from the environment.
+    
+    Returns:
+        SMTPConnectionPool, or None if email is not configured
+    """
+    global _smtp_pool
+    smtp_server = os.environ.get("SMTP_SERVER")
+    smtp_username = os.environ.get("SMTP_USERNAME")
+    smtp_password = os.environ.get("SMTP_PASSWORD")
+    if not all([os.environ.get("EMAIL_SENDER"), smtp_server, smtp_username, smtp_password]):
+        return None
+    
+    with _smtp_pool_lock:
+        if _smtp_pool is None:
+            _smtp_pool = SMTPConnectionPool(
+                smtp_server,
+                int(os.environ.get("SMTP_PORT", "587")),
+                smtp_username,
+                smtp_password,
+                size=int(os.environ.get("SMTP_POOL_SIZE", "4")),
+                idle_timeout=float(os.environ.get("SMTP_POOL_IDLE_TIMEOUT", "60")),
+                use_tls=os.environ.get("SMTP_STARTTLS", "true").lower() != "false"
+            )
+        return _smtp_pool
+
+def build_results_message(sender_email: str, recipient_email: str, html_content: Union[str, bytes]) -> MIMEMultipart:
+    """
+    Create the MIME message for a results email.
+    
+    html_content may be a str or UTF-8 bytes from utils.create_report_bytes;
+    bytes are base64-encoded straight into the message without decoding.
+    """
+    message = MIMEMultipart("alternative")
+    message["Subject"] = "Your Divorce Experience Assessment Results"
+    message["From"] = sender_email
+    message["To"] = recipient_email
+    
+    # Add the HTML content
+    if isinstance(html_content, bytes):
+        html_part = MIMENonMultipart("text", "html", charset="utf-8")
+        html_part.set_payload(html_content)
+        encoders.encode_base64(html_part)
+    else:
+        html_part = MIMEText(html_content, "html")
+    message.attach(html_part)
+    
+    return message
+
+def send_many(emails: Iterable[Tuple[str, Union[str, bytes]]]) -> List[Optional[Exception]]:
+    """
+    Send several results emails over one pooled SMTP session.
+    
+    Args:
+        emails: Iterable of (recipient_email, html_content) pairs; html_content may be str or bytes
+    
+    Returns:
+        One entry per email: None on success, or the exception raised
+    """
+    logger = logging.getLogger("email_sender")
+    emails = list(emails)
+    
+    pool = get_smtp_pool()
+    if pool is None:
+        logger.warning("Missing email configuration - cannot send actual email")
+        for recipient_email, _ in emails:
+            logger.info(f"Would send assessment results to: {recipient_email}")
+        return [None] * len(emails)
+    
+    sender_email = os.environ.get("EMAIL_SENDER")
+    messages = [build_results_message(sender_email, recipient, html) for recipient, html in emails]
+    errors = pool.send_many(messages)
+    
+    for (recipient_email, _), error in zip(emails, errors):
+        if error is None:
+            EMAILS_SENT_TOTAL.inc()
+            logger.info(f"Email successfully sent to {recipient_email}")
+        else:
+            SMTP_FAILURES_TOTAL.inc()
+            logger.error(f"Failed to send email to {recipient_email}: {str(error)}")
+    
+    return errors
+
+def deliver_results_email(recipient_email: str, html_content: str) -> None:
+    """
+    Send the results email over a pooled SMTP connection.
+    
+    Unlike send_results_email this raises on failure, so callers such as
+    the outbox worker can retry.
+    
+    Args:
+        recipient_email: User's email address
+        html_content: HTML content for the email body
+    """
+    error = send_many([(recipient_email, html_content)])[0]
+    if error is not None:
+        raise error
+
+def send_results_email(recipient_email: str, html_content: str, scores: Dict[str, Any],
+                       responses: Optional[Dict[str, Any]] = None,
+                       submission_key: Optional[str] = None) -> bool:
     """
     Send assessment results to the provided email address.
     
@@ -17,6 +289,8 @@ def send_results_email(recipient_email: str, html_content: str, scores: Dict[str
         recipient_email: User's email address
         html_content: HTML content for the email body
         scores: Dictionary of assessment scores
+        responses: Optional dictionary of user responses, kept in the backup
+        submission_key: Optional idempotency key, kept in the backup
         
     Returns:
         Boolean indicating success or failure
@@ -26,73 +300,11 @@ def send_results_email(recipient_email: str, html_content: str, scores: Dict[str
     logger = logging.getLogger("email_sender")
     
     # First save locally as a backup regardless of email success
-    try:
-        email_log_dir = "email_logs"
-        os.makedirs(email_log_dir, exist_ok=True)
-        
-        # Create a safe filename using timestamp and email
-        safe_email = recipient_email.replace('@', '_at_').replace('.', '_dot_')
-        filename = f"{email_log_dir}/email_{safe_email}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-        
-        # Write the HTML content to the file
-        with open(filename, 'w') as f:
-            f.write(html_content)
-        
-        logger.info(f"Email content saved to file: {filename}")
-        
-        # Save scores to a JSON file
-        scores_filename = f"{email_log_dir}/scores_{safe_email}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(scores_filename, 'w') as f:
-            json.dump(scores, f, indent=4)
-        
-        logger.info(f"Scores saved to file: {scores_filename}")
-        
-    except Exception as file_error:
-        logger.error(f"Could not save email content to file: {str(file_error)}")
+    save_email_backup(recipient_email, html_content, scores, responses, submission_key)
     
     # Now attempt to send the actual email
     try:
-        # Get email configuration from environment
-        sender_email = os.environ.get("EMAIL_SENDER")
-        smtp_server = os.environ.get("SMTP_SERVER")
-        smtp_port = int(os.environ.get("SMTP_PORT", "587"))
-        smtp_username = os.environ.get("SMTP_USERNAME")
-        smtp_password = os.environ.get("SMTP_PASSWORD")
-        
-        # Check if we have the necessary configurations
-        if not all([sender_email, smtp_server, smtp_username, smtp_password]):
-            logger.warning("Missing email configuration - cannot send actual email")
-            logger.info(f"Would send assessment results to: {recipient_email}")
-            return True
-        
-        logger.info(f"Preparing to send email to {recipient_email}")
-        logger.info(f"Using SMTP server: {smtp_server}:{smtp_port}")
-        
-        # Create the email message
-        message = MIMEMultipart("alternative")
-        message["Subject"] = "Your Divorce Experience Assessment Results"
-        message["From"] = sender_email
-        message["To"] = recipient_email
-        
-        # Add the HTML content
-        html_part = MIMEText(html_content, "html")
-        message.attach(html_part)
-        
-        # Create secure connection and send email
-        context = ssl.create_default_context()
-        
-        # Connect and send
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            logger.info("Starting TLS connection...")
-            server.starttls(context=context)
-            
-            logger.info("Logging in to SMTP server...")
-            server.login(smtp_username, smtp_password)
-            
-            logger.info("Sending email...")
-            server.send_message(message)
-            
-        logger.info(f"Email successfully sent to {recipient_email}")
+        deliver_results_email(recipient_email, html_content)
         return True
     
     except Exception as e:
@@ -0,0 +1,245 @@
+import os
+import csv
+import gzip
+import time
+import datetime
+import threading
+import traceback
+
+from database import RESULT_FRAME_COLUMNS, iter_assessment_results, count_assessment_results
+from questionnaire import REGISTRY
+
+# Where background exports are written. They hold every respondent's
+# email, so they are only offered for download on the admin page and are
+# deleted EXPORT_MAX_AGE_MINUTES after they were last written.
+EXPORT_DIR = os.environ.get("EXPORT_DIR", "exports")
+EXPORT_MAX_AGE_MINUTES = float(os.environ.get("EXPORT_MAX_AGE_MINUTES", "60"))
+EXPORT_CLEANUP_INTERVAL_SECONDS = float(os.environ.get("EXPORT_CLEANUP_INTERVAL_SECONDS", "300"))
+EXPORT_FORMATS = ('csv', 'csv.gz', 'parquet')
+
+_cleanup_thread = None
+_cleanup_lock = threading.Lock()
+
+def response_columns():
+    """Column names for flattened responses, one per questionnaire question."""
+    return [f"response_{question_id}" for question_id in REGISTRY.questions]
+
+def _flatten(row, include_responses):
+    values = [getattr(row, name) for name in RESULT_FRAME_COLUMNS]
+    if include_responses:
+        responses = row.responses or {}
+        values.extend(responses.get(question_id) for question_id in REGISTRY.questions)
+    return values
+
+def export_results(path, fmt='csv', include_responses=False, batch_size=5000, progress=None):
+    """
+    Stream every assessment result to a file.
+    
+    Rows are read with keyset pagination and written chunk by chunk, so
+    memory use does not grow with the table.
+    
+    Args:
+        path: Output file path
+        fmt: 'csv', 'csv.gz' or 'parquet' (parquet requires pyarrow)
+        include_responses: Add one column per questionnaire answer
+        batch_size: Rows read and written per chunk
+        progress: Optional callable(rows_written, total_rows) called after each chunk
+    
+    Returns:
+        Number of rows written
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    
+    columns = list(RESULT_FRAME_COLUMNS)
+    if include_responses:
+        columns += response_columns()
+    load_columns = list(RESULT_FRAME_COLUMNS) + (['responses'] if include_responses else [])
+    total = count_assessment_results()
+    rows = iter_assessment_results(batch_size=batch_size, columns=load_columns)
+    
+    if fmt == 'parquet':
+        return _export_parquet(path, columns, rows, include_responses, batch_size, total, progress)
+    
+    opener = gzip.open if fmt == 'csv.gz' else open
+    written = 0
+    with opener(path, 'wt', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(_flatten(row, include_responses))
+            written += 1
+            if progress and written % batch_size == 0:
+                progress(written, total)
+    
+    if progress:
+        progress(written, total)
+    return written
+
+def _export_parquet(path, columns, rows, include_responses, batch_size, total, progress):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+    
+    fields = []
+    for name in columns:
+        if name == 'created_at':
+            fields.append(pa.field(name, pa.timestamp('us')))
+        elif name == 'id' or name.endswith('_count'):
+            fields.append(pa.field(name, pa.int64()))
+        elif name.endswith('_score'):
+            fields.append(pa.field(name, pa.float64()))
+        else:
+            fields.append(pa.field(name, pa.string()))
+    schema = pa.schema(fields)
+    
+    written = 0
+    chunk = []
+    with pq.ParquetWriter(path, schema) as writer:
+        def write_chunk():
+            writer.write_table(pa.Table.from_pylist([dict(zip(columns, values)) for values in chunk], schema=schema))
+        
+        for row in rows:
+            chunk.append(_flatten(row, include_responses))
+            if len(chunk) >= batch_size:
+                write_chunk()
+                written += len(chunk)
+                chunk = []
+                if progress:
+                    progress(written, total)
+        if chunk:
+            write_chunk()
+            written += len(chunk)
+    
+    if progress:
+        progress(written, total)
+    return written
+
+class ExportJob(threading.Thread):
+    """
+    Background export of the full assessment table to a file.
+    
+    The file is written under a temporary name and renamed when complete,
+    so path only ever refers to a finished export.
+    """
+    
+    def __init__(self, path, fmt='csv', include_responses=False, batch_size=5000):
+        super().__init__(name="assessment-export", daemon=True)
+        self.path = path
+        self.fmt = fmt
+        self.include_responses = include_responses
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self.total_rows = None
+        self.status = 'pending'  # pending, running, done, failed
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+    
+    @property
+    def progress(self):
+        """Fraction of rows written, between 0 and 1."""
+        if self.status == 'done':
+            return 1.0
+        if not self.total_rows:
+            return 0.0
+        return min(self.rows_written / self.total_rows, 1.0)
+    
+    def _report(self, rows_written, total_rows):
+        self.rows_written = rows_written
+        self.total_rows = total_rows
+    
+    def run(self):
+        self.status = 'running'
+        self.started_at = datetime.datetime.now()
+        partial_path = f"{self.path}.partial"
+        try:
+            self.rows_written = export_results(
+                partial_path,
+                fmt=self.fmt,
+                include_responses=self.include_responses,
+                batch_size=self.batch_size,
+                progress=self._report
+            )
+            os.replace(partial_path, self.path)
+            self.status = 'done'
+        except Exception as e:
+            print(f"Error exporting assessment results: {str(e)}")
+            print(traceback.format_exc())
+            self.error = str(e)
+            self.status = 'failed'
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+        finally:
+            self.finished_at = datetime.datetime.now()
+
+def start_export(fmt='csv', include_responses=False, directory=EXPORT_DIR):
+    """
+    Start a background export of the full assessment table.
+    
+    Args:
+        fmt: 'csv', 'csv.gz' or 'parquet'
+        include_responses: Add one column per questionnaire answer
+        directory: Directory the export file is written to
+    
+    Returns:
+        The running ExportJob
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    
+    os.makedirs(directory, exist_ok=True)
+    start_export_cleanup(directory)
+    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    job = ExportJob(os.path.join(directory, f"divorce_assessment_data_{timestamp}.{fmt}"), fmt, include_responses)
+    job.start()
+    return job
+
+def read_export(path):
+    """Read a finished export file, for the admin page's download button."""
+    with open(path, 'rb') as f:
+        return f.read()
+
+def remove_old_exports(directory=EXPORT_DIR, max_age_minutes=EXPORT_MAX_AGE_MINUTES):
+    """
+    Delete export files last written more than max_age_minutes ago.
+    
+    A running export rewrites its .partial file with every batch, so only
+    files left behind by finished or abandoned exports are removed.
+    
+    Returns:
+        Number of files deleted
+    """
+    if not os.path.isdir(directory):
+        return 0
+    cutoff = time.time() - max_age_minutes * 60
+    removed = 0
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.startswith("divorce_assessment_data_") and entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+def start_export_cleanup(directory=EXPORT_DIR, interval=EXPORT_CLEANUP_INTERVAL_SECONDS):
+    """Start deleting expired exports every interval seconds, once per process."""
+    global _cleanup_thread
+    with _cleanup_lock:
+        if _cleanup_thread is not None and _cleanup_thread.is_alive():
+            return _cleanup_thread
+        
+        def run():
+            while True:
+                try:
+                    remove_old_exports(directory)
+                except Exception as e:
+                    print(f"Error removing old exports: {str(e)}")
+                time.sleep(interval)
+        
+        _cleanup_thread = threading.Thread(target=run, name="export-cleanup", daemon=True)
+        _cleanup_thread.start()
+        return _cleanup_thread
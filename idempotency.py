@@ -0,0 +1,101 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# How long a processed submission is remembered in this process. The unique
+# submission_key columns catch repeats across processes and after expiry.
+IDEMPOTENCY_TTL_SECONDS = float(os.environ.get("IDEMPOTENCY_TTL_SECONDS", "3600"))
+IDEMPOTENCY_MAX_ENTRIES = int(os.environ.get("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+
+IN_PROGRESS = 'in_progress'
+DONE = 'done'
+
+def submission_key(session_token: str, responses: Dict[str, Any]) -> str:
+    """
+    Build the idempotency key for a submission.
+    
+    The same session submitting the same answers always gets the same key,
+    so double clicks and reruns map to one submission.
+    
+    Args:
+        session_token: Random token stored in the user's session state
+        responses: Dictionary of user responses
+    
+    Returns:
+        Hex SHA-256 digest (64 characters)
+    """
+    canonical = json.dumps(responses, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(f"{session_token}\n{canonical}".encode('utf-8')).hexdigest()
+
+class TTLCache:
+    """Thread-safe mapping whose entries expire after ttl seconds, bounded to max_entries."""
+    
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL_SECONDS, max_entries: int = IDEMPOTENCY_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value), oldest first
+        self._lock = threading.Lock()
+    
+    def _expire(self, now: float):
+        while self._entries:
+            key, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[key]
+    
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            self._expire(time.monotonic())
+            entry = self._entries.get(key)
+            return entry[1] if entry is not None else None
+    
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._entries.pop(key, None)
+            self._entries[key] = (now + self.ttl, value)
+            self._expire(now)
+    
+    def set_if_absent(self, key: str, value: Any) -> Optional[Any]:
+        """Store value unless the key is present. Returns the existing value, or None if stored."""
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry[1]
+            self._entries[key] = (now + self.ttl, value)
+            self._expire(now)
+            return None
+    
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def __len__(self):
+        with self._lock:
+            self._expire(time.monotonic())
+            return len(self._entries)
+
+_submissions = TTLCache()
+
+def begin_submission(key: str) -> Optional[str]:
+    """
+    Claim a submission for processing.
+    
+    Returns:
+        None if the caller should process it, otherwise IN_PROGRESS or DONE
+    """
+    return _submissions.set_if_absent(key, IN_PROGRESS)
+
+def complete_submission(key: str) -> None:
+    """Mark a claimed submission as fully processed."""
+    _submissions.set(key, DONE)
+
+def abandon_submission(key: str) -> None:
+    """Release a claimed submission that did not finish, so a retry can process it."""
+    _submissions.delete(key)
@@ -0,0 +1,127 @@
+"""
+Maintenance commands for the assessment database.
+
+Usage:
+    python manage.py migrate [--lock-timeout 5s]
+    python manage.py rebuild-rollups [--batch-size N]
+    python manage.py backfill-strategies [--batch-size N] [--rebuild-rollups]
+    python manage.py replay-backups (--reinsert | --resend | --dry-run) [--email E] [--since T] [--until T]
+"""
+import os
+import sys
+import time
+import argparse
+import datetime
+
+def migrate(args):
+    from database import migrate_schema
+    started = time.perf_counter()
+    changes = migrate_schema(lock_timeout=args.lock_timeout)
+    for change in changes:
+        print(f"  {change}")
+    print(f"Schema up to date ({len(changes)} changes) in {time.perf_counter() - started:.1f}s")
+
+def rebuild_rollups(args):
+    from database import rebuild_rollups
+    started = time.perf_counter()
+    counted = rebuild_rollups(batch_size=args.batch_size)
+    print(f"Rebuilt dashboard rollups from {counted} assessment results in {time.perf_counter() - started:.1f}s")
+
+def backfill_strategies(args):
+    from database import backfill_strategy_columns
+    started = time.perf_counter()
+    updated = backfill_strategy_columns(batch_size=args.batch_size)
+    print(f"Backfilled strategy columns for {updated} assessment results in {time.perf_counter() - started:.1f}s")
+    if not updated:
+        return
+    
+    # Rollup rows for the backfilled results are still filed under an empty strategy
+    if args.rebuild_rollups:
+        rebuild_rollups(args)
+    else:
+        print("WARNING: dashboard rollups still count these results under no strategy; "
+              "run `python manage.py rebuild-rollups` (saves wait while it runs)")
+
+def replay_backups(args):
+    from backup_log import read_records
+    records = read_records(args.dir, email=args.email, since=args.since, until=args.until)
+    
+    if args.dry_run:
+        count = 0
+        for record in records:
+            count += 1
+            print(f"{record['timestamp']}  {record['email']}  {record['scores'].get('dominant_strategy', '')}")
+        print(f"{count} backed-up submissions match")
+        return
+    
+    if args.reinsert:
+        from database import save_assessment_result, save_assessment_results_bulk
+        inserted = keyed = 0
+        unkeyed = []
+        for record in records:
+            created_at = datetime.datetime.fromisoformat(record['timestamp'])
+            key = record.get('submission_key')
+            if key is None:
+                # Backups recorded before submission keys were kept
+                unkeyed.append((record['email'], record['scores'], record['responses'] or {}, created_at))
+                if len(unkeyed) >= 1000:
+                    inserted += save_assessment_results_bulk(unkeyed)
+                    unkeyed = []
+            elif save_assessment_result(record['email'], record['scores'], record['responses'] or {},
+                                        refresh=False, submission_key=key, created_at=created_at) is not None:
+                # Idempotent on the key, so a submission already stored is not duplicated
+                keyed += 1
+        inserted += save_assessment_results_bulk(unkeyed)
+        print(f"Re-inserted {inserted} assessment results without a submission key from {args.dir}; "
+              f"{keyed} with a key are stored, without duplicating any already saved")
+    else:
+        from database import enqueue_email
+        from email_queue import EmailWorker
+        queued = []
+        for record in records:
+            entry_id = enqueue_email(record['email'], record['html'], record['scores'], record['responses'], replayed=True)
+            if entry_id is not None:
+                queued.append(entry_id)
+        
+        # Deliver through the outbox so failures are retried like any other
+        # send; other pending entries are left to the running workers
+        worker = EmailWorker()
+        for start in range(0, len(queued), 500):
+            while worker.process_due(ids=queued[start:start + 500]):
+                pass
+        print(f"Queued {len(queued)} emails from {args.dir}; undelivered ones stay in the outbox for retry")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintenance commands for the assessment database.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    migrate_parser = commands.add_parser("migrate", help="Build indexes (and add columns) missing from existing tables (run once per deploy)")
+    migrate_parser.add_argument("--lock-timeout", default=os.environ.get("SCHEMA_LOCK_TIMEOUT", "5s"), help="PostgreSQL: give up on a column if its table lock takes longer than this")
+    migrate_parser.set_defaults(handler=migrate)
+    
+    rebuild = commands.add_parser("rebuild-rollups", help="Recompute assessment_rollups from assessment_results")
+    rebuild.add_argument("--batch-size", type=int, default=5000, help="Results fetched per round trip")
+    rebuild.set_defaults(handler=rebuild_rollups)
+    
+    backfill = commands.add_parser("backfill-strategies", help="Re-score rows missing dominant_strategy and strategy counts")
+    backfill.add_argument("--batch-size", type=int, default=1000, help="Rows re-scored per batch")
+    backfill.add_argument("--rebuild-rollups", action="store_true", help="Rebuild the dashboard rollups afterwards")
+    backfill.set_defaults(handler=backfill_strategies)
+    
+    replay = commands.add_parser("replay-backups", help="Re-insert or re-send submissions from the email backup log")
+    action = replay.add_mutually_exclusive_group(required=True)
+    action.add_argument("--reinsert", action="store_true", help="Insert the submissions into assessment_results again")
+    action.add_argument("--resend", action="store_true", help="Send the results emails again")
+    action.add_argument("--dry-run", action="store_true", help="Only list matching submissions")
+    replay.add_argument("--dir", default=os.environ.get("BACKUP_LOG_DIR", "email_logs"), help="Backup log directory")
+    replay.add_argument("--email", help="Only submissions for this address")
+    replay.add_argument("--since", help="Only submissions at or after this UTC time (ISO format, e.g. 2024-05-01)")
+    replay.add_argument("--until", help="Only submissions before this UTC time (ISO format)")
+    replay.set_defaults(handler=replay_backups)
+    
+    args = parser.parse_args(argv)
+    args.handler(args)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
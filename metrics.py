@@ -0,0 +1,311 @@
+import os
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Tuple
+
+# In-process counters, gauges and histograms, exposed in the Prometheus
+# text format on a local HTTP port (METRICS_PORT) and/or written to a file
+# that is replaced every METRICS_FILE_INTERVAL_SECONDS (METRICS_FILE, in
+# the format node_exporter's textfile collector reads). Both are off
+# unless configured; recording metrics is always cheap.
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = os.environ.get("METRICS_PORT")
+METRICS_FILE = os.environ.get("METRICS_FILE")
+METRICS_FILE_INTERVAL_SECONDS = float(os.environ.get("METRICS_FILE_INTERVAL_SECONDS", "15"))
+
+# Upper bounds in seconds, from sub-millisecond scoring to slow SMTP sessions
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+logger = logging.getLogger("metrics")
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+_exporters_started = False
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    """Base for metrics with optional labels; one series per label combination."""
+    
+    kind = "untyped"
+    
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines) + "\n"
+    
+    def _samples(self):
+        return []
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. errors or emails sent."""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values = {} if labelnames else {(): 0}
+    
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+    
+    def _samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+class Gauge(_Metric):
+    """
+    Value that goes up and down, e.g. outbox depth.
+    
+    A gauge can be given a function instead of being set, in which case
+    the function is called each time metrics are exported.
+    """
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self._value = 0
+        self._function = None
+    
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+    
+    def set_function(self, function: Callable[[], float]) -> None:
+        with self._lock:
+            self._function = function
+    
+    def value(self) -> float:
+        with self._lock:
+            function, value = self._function, self._value
+        if function is None:
+            return value
+        try:
+            return function()
+        except Exception as e:
+            logger.warning(f"Could not read gauge {self.name}: {str(e)}")
+            return float("nan")
+    
+    def _samples(self):
+        return [f"{self.name} {_format_value(self.value())}"]
+
+class Histogram(_Metric):
+    """Distribution of observed values (latencies in seconds) over fixed buckets."""
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+    
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+    
+    @contextmanager
+    def time(self, **labels):
+        """Observe how long the block takes, including when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+    
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return sum(series[:-1]) if series else 0
+    
+    def _samples(self):
+        with self._lock:
+            series = [(key, list(values)) for key, values in self._series.items()]
+        
+        lines = []
+        bounds = self.buckets + (float("inf"),)
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip(bounds, values):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(values[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+def _register(metric: _Metric) -> _Metric:
+    with _metrics_lock:
+        existing = _metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        _metrics[metric.name] = metric
+        return metric
+
+def counter(name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+    """Return the counter with this name, creating it on first use."""
+    return _register(Counter(name, help_text, labelnames))
+
+def gauge(name: str, help_text: str) -> Gauge:
+    """Return the gauge with this name, creating it on first use."""
+    return _register(Gauge(name, help_text))
+
+def histogram(name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+              buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    """Return the histogram with this name, creating it on first use."""
+    return _register(Histogram(name, help_text, labelnames, buckets))
+
+def render() -> str:
+    """Return every metric in the Prometheus text exposition format."""
+    with _metrics_lock:
+        metrics = sorted(_metrics.values(), key=lambda metric: metric.name)
+    return "".join(metric.render() for metric in metrics)
+
+# Metrics recorded by the app, the database helpers and the email outbox
+SUBMIT_STAGE_SECONDS = histogram(
+    "questionnaire_submit_stage_seconds",
+    "Time spent in each stage of a questionnaire submission.",
+    ("stage",)
+)
+SUBMISSIONS_TOTAL = counter(
+    "questionnaire_submissions_total",
+    "Questionnaire submissions by outcome.",
+    ("result",)
+)
+DATABASE_ERRORS_TOTAL = counter(
+    "questionnaire_database_errors_total",
+    "Database operations that failed, by operation.",
+    ("operation",)
+)
+EMAILS_SENT_TOTAL = counter(
+    "questionnaire_emails_sent_total",
+    "Results emails accepted by the SMTP server."
+)
+SMTP_FAILURES_TOTAL = counter(
+    "questionnaire_smtp_failures_total",
+    "Results emails the SMTP server rejected or could not be sent."
+)
+EMAIL_QUEUE_DEPTH = gauge(
+    "questionnaire_email_queue_depth",
+    "Outbox entries waiting for delivery."
+)
+
+def start_metrics_server(port: int, host: str = METRICS_HOST):
+    """
+    Serve render() at http://host:port/metrics on a background thread.
+    
+    Returns:
+        The HTTP server, or None if the port could not be bound
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    try:
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+    except OSError as e:
+        logger.warning(f"Could not start metrics server on {host}:{port}: {str(e)}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+def write_metrics_file(path: str) -> None:
+    """Write render() to path, replacing the previous snapshot atomically."""
+    partial = f"{path}.{os.getpid()}.partial"
+    with open(partial, "w") as f:
+        f.write(render())
+    os.replace(partial, path)
+
+def start_metrics_file_writer(path: str, interval: float = METRICS_FILE_INTERVAL_SECONDS) -> threading.Thread:
+    """Rewrite the metrics file every interval seconds on a background thread."""
+    def run():
+        while True:
+            try:
+                write_metrics_file(path)
+            except Exception as e:
+                logger.warning(f"Could not write metrics file {path}: {str(e)}")
+            time.sleep(interval)
+    
+    thread = threading.Thread(target=run, name="metrics-file-writer", daemon=True)
+    thread.start()
+    return thread
+
+def _count_pending_emails() -> float:
+    import database
+    return database.count_pending_emails()
+
+def start_exporters() -> None:
+    """Start the exporters configured in the environment, once per process."""
+    global _exporters_started
+    with _metrics_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+    
+    # Read when metrics are exported rather than tracked on every change.
+    # database is imported on the first scrape, not when exporters start,
+    # so processes that never touch the outbox still report its depth.
+    EMAIL_QUEUE_DEPTH.set_function(_count_pending_emails)
+    
+    if METRICS_PORT:
+        start_metrics_server(int(METRICS_PORT))
+    if METRICS_FILE:
+        start_metrics_file_writer(METRICS_FILE)
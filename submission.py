@@ -0,0 +1,141 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from analyzer import calculate_scores, generate_feedback, generate_improvement_suggestions
+from utils import create_report_html
+from idempotency import submission_key, begin_submission, complete_submission, abandon_submission, DONE
+from metrics import SUBMIT_STAGE_SECONDS, SUBMISSIONS_TOTAL, DATABASE_ERRORS_TOTAL
+
+# The submit pipeline shared by app.py and benchmarks/loadtest.py, so the
+# load test always measures what the app runs. Streamlit is not used here.
+
+# Stages of process_submission, in order, as recorded in SUBMIT_STAGE_SECONDS
+STAGES = ('score', 'feedback', 'suggestions', 'report', 'save', 'email')
+
+# Results of submit(), as counted in SUBMISSIONS_TOTAL
+SUCCESS = 'success'
+FAILED = 'failed'
+DUPLICATE = 'duplicate'
+IN_PROGRESS = 'in_progress'
+
+@contextmanager
+def _stage(stage: str, stage_times: Optional[Dict[str, float]]):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        SUBMIT_STAGE_SECONDS.observe(elapsed, stage=stage)
+        if stage_times is not None:
+            stage_times[stage] = elapsed
+
+def submit(session_token: str, email: str, responses: Dict[str, Any],
+           stage_times: Optional[Dict[str, float]] = None) -> str:
+    """
+    Run a completed questionnaire through the submit pipeline once.
+    
+    A repeated submit (double click, reconnect during the spinner) has the
+    same idempotency key and is short-circuited before any scoring, saving
+    or sending. The claim is released if processing fails or is
+    interrupted, so a retry completes whatever steps are missing.
+    
+    Args:
+        session_token: Random token stored in the user's session state
+        email: Validated address the results are sent to
+        responses: Dictionary of user responses
+        stage_times: Optional dictionary filled with seconds per stage
+    
+    Returns:
+        SUCCESS, FAILED, DUPLICATE (already submitted) or IN_PROGRESS
+        (being processed by another run)
+    """
+    key = submission_key(session_token, responses)
+    state = begin_submission(key)
+    if state == DONE:
+        SUBMISSIONS_TOTAL.inc(result=DUPLICATE)
+        return DUPLICATE
+    elif state is not None:
+        SUBMISSIONS_TOTAL.inc(result=IN_PROGRESS)
+        return IN_PROGRESS
+    
+    # The database module is only needed on submit, so it is imported here
+    # rather than on every script run
+    from database import is_submission_complete
+    
+    success = False
+    try:
+        # Another process may have finished this submission already
+        if is_submission_complete(key):
+            result = DUPLICATE
+            success = True
+        else:
+            success = process_submission(email, key, responses, stage_times)
+            result = SUCCESS if success else FAILED
+        SUBMISSIONS_TOTAL.inc(result=result)
+    finally:
+        if success:
+            complete_submission(key)
+        else:
+            abandon_submission(key)
+    return result
+
+def process_submission(email: str, key: str, responses: Dict[str, Any],
+                       stage_times: Optional[Dict[str, float]] = None) -> bool:
+    """
+    Score, save and queue the results email for a submission.
+    
+    Saving and queuing are idempotent on the submission key, so a retry
+    after an interrupted run does not duplicate either.
+    
+    Args:
+        email: Address the results are sent to
+        key: Idempotency key of the submission
+        responses: Dictionary of user responses
+        stage_times: Optional dictionary filled with seconds per stage
+    
+    Returns:
+        True if the results email was queued
+    """
+    from database import save_assessment_result
+    from email_queue import queue_results_email
+    
+    with _stage('score', stage_times):
+        scores = calculate_scores(responses)
+    
+    with _stage('feedback', stage_times):
+        feedback = generate_feedback(scores, responses)
+    
+    with _stage('suggestions', stage_times):
+        suggestions = generate_improvement_suggestions(scores, responses)
+    
+    with _stage('report', stage_times):
+        html_report = create_report_html(scores, feedback, suggestions, responses)
+    
+    with _stage('save', stage_times):
+        try:
+            save_assessment_result(
+                email,
+                {
+                    'overall': scores['overall'],
+                    'dominant_strategy': scores['dominant_strategy'],
+                    'strategy_counts': scores['strategy_counts'],
+                    # Leave these as 0 since they're not used in the new assessment
+                    'legal_score': 0,
+                    'emotional_score': 0,
+                    'financial_score': 0,
+                    'children_score': 0,
+                    'recovery_score': 0
+                },
+                responses,
+                refresh=False,
+                submission_key=key
+            )
+        except Exception as e:
+            print(f"Database error: {str(e)}")
+            DATABASE_ERRORS_TOTAL.inc(operation='save_assessment_result')
+            # Don't fail the submission, just continue to send email
+    
+    # The outbox worker delivers the email in the background
+    with _stage('email', stage_times):
+        return queue_results_email(email, html_report, scores, responses, submission_key=key)
@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from analyzer import SCORING_TABLE, calculate_scores, calculate_scores_batch
+
+QUESTION_IDS = list(SCORING_TABLE)
+
+def answers_for(codes):
+    """Build responses choosing, for each question, the option scored as the given code (None skips it)."""
+    responses = {}
+    for question_id, code in zip(QUESTION_IDS, codes):
+        if code is None:
+            continue
+        options = SCORING_TABLE[question_id]
+        responses[question_id] = next(option for option, strategy in options.items() if strategy == code)
+    return responses
+
+def assert_batch_matches(responses_list):
+    assert calculate_scores_batch(responses_list) == [calculate_scores(responses or {}) for responses in responses_list]
+
+def test_batch_matches_single_on_random_responses():
+    rng = random.Random(1234)
+    responses_list = []
+    for _ in range(3000):
+        responses = {}
+        for question_id, options in SCORING_TABLE.items():
+            choice = rng.random()
+            if choice < 0.1:
+                continue  # unanswered
+            if choice < 0.15:
+                responses[question_id] = "Not one of the options"
+            else:
+                responses[question_id] = rng.choice(list(options))
+        responses_list.append(responses)
+    assert_batch_matches(responses_list)
+
+def test_empty_input():
+    assert calculate_scores_batch([]) == []
+    assert calculate_scores_batch(iter(())) == []
+
+@pytest.mark.parametrize("responses", [
+    {},
+    None,
+    {'email': 'someone@example.com'},
+    {question_id: "Not one of the options" for question_id in QUESTION_IDS},
+    {question_id: "" for question_id in QUESTION_IDS},
+])
+def test_all_zero_rows_default_to_balanced(responses):
+    scores = calculate_scores_batch([responses])[0]
+    assert scores == calculate_scores(responses or {})
+    assert scores['dominant_strategy'] == 'B'
+    assert scores['overall'] == 0
+    assert sum(scores['strategy_counts'].values()) == 0
+
+def test_missing_and_unknown_answers():
+    half = len(QUESTION_IDS) // 2
+    responses_list = [
+        answers_for(['C'] + [None] * (len(QUESTION_IDS) - 1)),
+        answers_for(['G', None] * half),
+        dict(answers_for(['H'] * len(QUESTION_IDS)), **{QUESTION_IDS[0]: "Not one of the options"}),
+        # Unhashable values are ignored rather than raising
+        dict(answers_for(['B'] * len(QUESTION_IDS)), **{QUESTION_IDS[1]: ['a', 'list']}),
+    ]
+    assert_batch_matches(responses_list)
+
+def test_ties():
+    n = len(QUESTION_IDS)
+    half, third = n // 2, n // 3
+    responses_list = [
+        answers_for(['G'] * half + ['B'] * (n - half)),
+        answers_for(['C'] * half + ['H'] * (n - half)),
+        answers_for(['H', 'G'] * half),
+        answers_for(['B'] * third + ['C'] * third + ['H'] * third + ['G'] * (n - 3 * third)),
+    ]
+    results = calculate_scores_batch(responses_list)
+    assert all(scores['has_tie'] for scores in results[:3])
+    assert_batch_matches(responses_list)
+
+def test_all_one_strategy():
+    for code in ('G', 'B', 'C', 'H'):
+        responses = answers_for([code] * len(QUESTION_IDS))
+        scores = calculate_scores_batch([responses])[0]
+        assert scores == calculate_scores(responses)
+        assert scores['dominant_strategy'] == code
+        assert scores['overall'] == 100
+        assert not scores['has_tie']
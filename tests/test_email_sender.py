@@ -0,0 +1,61 @@
+import smtplib
+
+import pytest
+
+import email_sender
+from benchmarks.smtp_stub import start_stub
+
+def configure(monkeypatch, server):
+    """Point email_sender's pool at the stub."""
+    host, port = server.server_address
+    monkeypatch.setenv("SMTP_SERVER", host)
+    monkeypatch.setenv("SMTP_PORT", str(port))
+    monkeypatch.setenv("SMTP_USERNAME", "user")
+    monkeypatch.setenv("SMTP_PASSWORD", "password")
+    monkeypatch.setenv("EMAIL_SENDER", "results@example.com")
+    monkeypatch.setenv("SMTP_STARTTLS", "false")
+    monkeypatch.setattr(email_sender, "_smtp_pool", None)
+
+@pytest.fixture
+def stub():
+    server = start_stub()
+    yield server
+    pool = email_sender._smtp_pool
+    if pool is not None:
+        pool.close()
+    server.shutdown()
+    server.server_close()
+
+def emails(count):
+    return [(f"user{number}@example.com", f"<p>Report {number}</p>") for number in range(count)]
+
+def test_send_many_reuses_one_connection(monkeypatch, stub):
+    configure(monkeypatch, stub)
+    
+    assert email_sender.send_many(emails(10)) == [None] * 10
+    assert email_sender.send_many(emails(5)) == [None] * 5
+    assert stub.connections == 1
+    assert stub.messages == 15
+
+def test_rejected_recipient_does_not_fail_the_batch(monkeypatch, stub):
+    configure(monkeypatch, stub)
+    stub.reject_rate = 0.5
+    
+    errors = email_sender.send_many(emails(20))
+    
+    refused = [error for error in errors if error is not None]
+    assert 0 < len(refused) < 20
+    assert all(isinstance(error, smtplib.SMTPRecipientsRefused) for error in refused)
+    assert len(refused) == stub.rejected
+    assert stub.messages == 20 - len(refused)
+    assert stub.connections == 1
+
+def test_dropped_connection_is_reconnected_once(monkeypatch, stub):
+    configure(monkeypatch, stub)
+    assert email_sender.send_many(emails(1)) == [None]
+    
+    stub.drop_connections()
+    
+    assert email_sender.send_many(emails(3)) == [None] * 3
+    assert stub.connections == 2
+    assert stub.messages == 4
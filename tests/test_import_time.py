@@ -0,0 +1,22 @@
+import os
+
+import pytest
+
+from benchmarks.import_time import BUDGET_MS, DEFERRED_MODULES, ROOT, app_import_ms, measure, startup_modules
+
+REPEAT = 3
+
+@pytest.fixture(scope="module")
+def startup():
+    """Import app.py's startup modules in fresh interpreters under -X importtime."""
+    modules = startup_modules(os.path.join(ROOT, "app.py"))
+    results = [measure(modules) for _ in range(REPEAT)]
+    return modules, [timings for timings, _ in results], results[-1][1]
+
+def test_app_imports_are_within_budget(startup):
+    modules, runs, _ = startup
+    assert app_import_ms(runs, modules) <= BUDGET_MS
+
+def test_submit_and_admin_modules_are_not_loaded_at_startup(startup):
+    _, _, loaded = startup
+    assert sorted(name for name in DEFERRED_MODULES if name in loaded) == []
@@ -0,0 +1,37 @@
+import json
+
+from analyzer import SCORING_TABLE, calculate_scores, generate_feedback, generate_improvement_suggestions
+from utils import create_report_html
+
+def sample_report_inputs(code='C'):
+    responses = {
+        question_id: next(option for option, strategy in options.items() if strategy == code)
+        for question_id, options in SCORING_TABLE.items()
+    }
+    scores = calculate_scores(responses)
+    return scores, generate_feedback(scores, responses), generate_improvement_suggestions(scores, responses), responses
+
+def test_suggestions_are_json_serializable():
+    for code in ('G', 'B', 'C', 'H'):
+        _, _, suggestions, _ = sample_report_inputs(code)
+        assert all(type(matchup) is dict for matchup in suggestions['matchups'])
+        json.dumps(suggestions)
+
+def test_report_renders_the_suggestions_and_feedback_passed_in():
+    scores, feedback, suggestions, responses = sample_report_inputs()
+    default_html = create_report_html(scores, feedback, suggestions, responses)
+    
+    feedback['distribution'] = "Custom distribution note"
+    suggestions['general'] = ["Custom general suggestion"]
+    suggestions['matchups'] = [{'ex_type': "Custom ex", 'risk': "Custom risk", 'tip': "Custom tip"}]
+    suggestions['recommendation'] = "Custom recommendation"
+    html = create_report_html(scores, feedback, suggestions, responses)
+    
+    for text in ("Custom distribution note", "Custom general suggestion", "Custom ex", "Custom risk", "Custom tip", "Custom recommendation"):
+        assert text in html
+        assert text not in default_html
+
+def test_report_accepts_unhashable_suggestions():
+    scores, feedback, suggestions, responses = sample_report_inputs()
+    suggestions['general'] = [["a", "list"]]
+    assert "<li>['a', 'list']</li>" in create_report_html(scores, feedback, suggestions, responses)
@@ -1,24 +1,10 @@
-import plotly.express as px
-import plotly.graph_objects as go
-import json
-import base64
-from io import BytesIO
+from functools import lru_cache
+from questionnaire import REGISTRY
+from analyzer import FRAGMENT_CACHE_SIZE
 
-def create_report_html(scores, feedback, suggestions, responses):
-    """
-    Create HTML content for the email report.
-    
-    Args:
-        scores: Dictionary of strategy scores and dominant strategy
-        feedback: Dictionary of feedback by category
-        suggestions: Dictionary of suggestions
-        responses: Dictionary of user responses
-        
-    Returns:
-        HTML string content for the email
-    """
-    # Create HTML content
-    html = f"""
+# Static parts of the report, built once at import. Each report only fills
+# the dynamic slots between them (see _report_parts).
+_REPORT_HEAD = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -26,84 +12,84 @@ def create_report_html(scores, feedback, suggestions, responses):
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <title>Your Divorce Strategy Profile Results</title>
         <style>
-            body {{
+            body {
                 font-family: Arial, sans-serif;
                 line-height: 1.6;
                 color: #333;
                 max-width: 800px;
                 margin: 0 auto;
                 padding: 20px;
-            }}
-            .header {{
+            }
+            .header {
                 background-color: #4a90e2;
                 color: white;
                 padding: 20px;
                 text-align: center;
                 border-radius: 5px 5px 0 0;
-            }}
-            .content {{
+            }
+            .content {
                 padding: 20px;
                 background-color: #f9f9f9;
                 border: 1px solid #ddd;
-            }}
-            .section {{
+            }
+            .section {
                 margin-bottom: 30px;
                 padding-bottom: 20px;
                 border-bottom: 1px solid #eee;
-            }}
-            .score-box {{
+            }
+            .score-box {
                 background-color: #f0f5ff;
                 border: 1px solid #d0e0ff;
                 padding: 15px;
                 border-radius: 5px;
                 margin-bottom: 20px;
                 text-align: center;
-            }}
-            .strategy {{
+            }
+            .strategy {
                 font-size: 24px;
                 font-weight: bold;
                 color: #4a90e2;
-            }}
-            .category {{
+            }
+            .category {
                 margin-top: 20px;
                 background-color: white;
                 border: 1px solid #eee;
                 padding: 15px;
                 border-radius: 5px;
-            }}
-            .category h3 {{
+            }
+            .category h3 {
                 color: #4a90e2;
                 margin-top: 0;
-            }}
-            .suggestions {{
+            }
+            .suggestions {
                 background-color: #f0fff5;
                 border: 1px solid #d0ffe0;
                 padding: 15px;
                 border-radius: 5px;
                 margin-top: 10px;
-            }}
-            .suggestions ul {{
+            }
+            .suggestions ul {
                 padding-left: 20px;
-            }}
-            .footer {{
+            }
+            .footer {
                 text-align: center;
                 padding: 20px;
                 color: #777;
                 font-size: 14px;
-            }}
-            .chart-container {{
+            }
+            .chart-container {
                 max-width: 100%;
                 height: auto;
                 margin: 20px 0;
                 text-align: center;
-            }}
-            .strategy-breakdown {{
+            }
+            .strategy-breakdown {
                 display: flex;
                 justify-content: space-between;
                 flex-wrap: wrap;
                 margin-bottom: 20px;
-            }}
-            .strategy-item {{
+            }
+            .strategy-item {
                 flex-basis: 22%;
                 background-color: #f0f5ff;
                 border: 1px solid #d0e0ff;
@@ -111,23 +97,23 @@ def create_report_html(scores, feedback, suggestions, responses):
                 border-radius: 5px;
                 text-align: center;
                 margin-bottom: 10px;
-            }}
-            .strategy-count {{
+            }
+            .strategy-count {
                 font-size: 20px;
                 font-weight: bold;
                 color: #4a90e2;
-            }}
-            .matchup {{
+            }
+            .matchup {
                 background-color: #fff5f0;
                 border: 1px solid #ffe0d0;
                 padding: 15px;
                 border-radius: 5px;
                 margin-top: 20px;
-            }}
-            .matchup h4 {{
+            }
+            .matchup h4 {
                 color: #e24a4a;
                 margin-top: 0;
-            }}
+            }
         </style>
     </head>
     <body>
@@ -141,57 +127,37 @@ def create_report_html(scores, feedback, suggestions, responses):
                 <h2>Your Dominant Strategy</h2>
                 <div class="score-box">
                     <p>Your dominant divorce strategy is:</p>
-                    <p class="strategy">{get_strategy_name(scores['dominant_strategy'])}</p>
+                    <p class="strategy">"""
+
+_REPORT_STRATEGY_CLOSE = """</p>
                 </div>
-                <p>{feedback['strategy']}</p>
+                <p>"""
+
+_REPORT_FEEDBACK_CLOSE = """</p>
     """
-    
-    # Add tie note if applicable
-    if scores.get('has_tie', False) and 'tie_note' in feedback:
-        html += f"<p><strong>Note:</strong> {feedback['tie_note']}</p>"
-    
-    html += """
+
+_REPORT_BREAKDOWN_OPEN = """
             </div>
             
             <div class="section">
                 <h2>Strategy Breakdown</h2>
                 <div class="strategy-breakdown">
     """
-    
-    # Add strategy breakdown
-    strategy_names = {
-        'G': 'The People‑Pleaser',
-        'B': 'The Diplomat',
-        'C': 'The Challenger',
-        'H': 'The Terminator'
-    }
-    
-    for strategy, count in scores['strategy_counts'].items():
-        html += f"""
-                    <div class="strategy-item">
-                        <p>{strategy_names.get(strategy, strategy)}</p>
-                        <p class="strategy-count">{count}</p>
-                        <p>questions</p>
-                    </div>
-        """
-    
-    html += """
+
+_REPORT_DISTRIBUTION_OPEN = """
                 </div>
-                <p>{}</p>
+                <p>"""
+
+_REPORT_SUGGESTIONS_OPEN = """</p>
             </div>
             
             <div class="section">
                 <h2>General Recommendations</h2>
                 <div class="suggestions">
                     <ul>
-    """.format(feedback.get('distribution', ''))
-    
-    # Add general suggestions
-    if 'general' in suggestions:
-        for suggestion in suggestions['general']:
-            html += f"<li>{suggestion}</li>\n"
-    
-    html += """
+    """
+
+_REPORT_MATCHUPS_OPEN = """
                     </ul>
                 </div>
             </div>
@@ -200,29 +166,8 @@ def create_report_html(scores, feedback, suggestions, responses):
                 <h2>Strategy Matchups</h2>
                 <p>How your strategy interacts with different ex-partner strategies:</p>
     """
-    
-    # Add matchup advice
-    if 'matchups' in suggestions:
-        for matchup in suggestions['matchups']:
-            html += f"""
-                <div class="matchup">
-                    <h4>If your ex uses: {matchup['ex_type']}</h4>
-                    <p><strong>Risk:</strong> {matchup['risk']}</p>
-                    <p><strong>Tip:</strong> {matchup['tip']}</p>
-                </div>
-            """
-    
-    # Add overall recommendation
-    if 'recommendation' in suggestions:
-        html += f"""
-                <div class="category" style="margin-top: 20px;">
-                    <h3>Overall Recommendation</h3>
-                    <p>{suggestions['recommendation']}</p>
-                </div>
-        """
-    
-    # Add closing sections
-    html += """
+
+_REPORT_CLOSING = """
             </div>
             
             <div class="section">
@@ -248,15 +193,127 @@ def create_report_html(scores, feedback, suggestions, responses):
     </body>
     </html>
     """
+
+def _report_parts(scores, feedback, suggestions):
+    """Return the report as a list of static shell pieces and filled slots."""
+    parts = [
+        _REPORT_HEAD,
+        get_strategy_name(scores['dominant_strategy']),
+        _REPORT_STRATEGY_CLOSE,
+        feedback['strategy'],
+        _REPORT_FEEDBACK_CLOSE
+    ]
     
-    return html
+    # Add tie note if applicable
+    if scores.get('has_tie', False) and 'tie_note' in feedback:
+        parts.append(f"<p><strong>Note:</strong> {feedback['tie_note']}</p>")
+    
+    # Breakdown, recommendations and matchups come prebuilt from the fragment
+    # cache, keyed on the values they are rendered from
+    general = suggestions.get('general')
+    matchups = suggestions.get('matchups')
+    key = (
+        tuple(scores['strategy_counts'].items()),
+        str(feedback.get('distribution', '')),
+        tuple(general) if general is not None else None,
+        tuple((matchup['ex_type'], matchup['risk'], matchup['tip']) for matchup in matchups) if matchups is not None else None,
+        suggestions.get('recommendation')
+    )
+    try:
+        parts.append(_results_fragment(*key))
+    except TypeError:
+        # Unhashable values passed in by a caller; render without the cache
+        parts.append(_build_results_fragment(*key))
+    
+    # Add closing sections
+    parts.append(_REPORT_CLOSING)
+    return parts
+
+def _build_results_fragment(count_items, distribution, general, matchups, recommendation):
+    """
+    Build the HTML between the dominant strategy and the closing sections.
+    
+    Args:
+        count_items: (strategy code, count) pairs for the breakdown
+        distribution: Distribution feedback text
+        general: General suggestions, or None
+        matchups: (ex type, risk, tip) triples, or None
+        recommendation: Overall recommendation, or None
+    """
+    parts = [_REPORT_BREAKDOWN_OPEN]
+    append = parts.append
+    
+    # Add strategy breakdown
+    for strategy, count in count_items:
+        append(f"""
+                    <div class="strategy-item">
+                        <p>{REGISTRY.strategy_name(strategy)}</p>
+                        <p class="strategy-count">{count}</p>
+                        <p>questions</p>
+                    </div>
+        """)
+    
+    append(_REPORT_DISTRIBUTION_OPEN)
+    append(distribution)
+    append(_REPORT_SUGGESTIONS_OPEN)
+    
+    # Add general suggestions
+    if general is not None:
+        for suggestion in general:
+            append(f"<li>{suggestion}</li>\n")
+    
+    append(_REPORT_MATCHUPS_OPEN)
+    
+    # Add matchup advice
+    if matchups is not None:
+        for matchup in matchups:
+            ex_type, risk, tip = matchup
+            append(f"""
+                <div class="matchup">
+                    <h4>If your ex uses: {ex_type}</h4>
+                    <p><strong>Risk:</strong> {risk}</p>
+                    <p><strong>Tip:</strong> {tip}</p>
+                </div>
+            """)
+    
+    # Add overall recommendation
+    if recommendation is not None:
+        append(f"""
+                <div class="category" style="margin-top: 20px;">
+                    <h3>Overall Recommendation</h3>
+                    <p>{recommendation}</p>
+                </div>
+        """)
+    
+    return ''.join(parts)
+
+# Most reports share a few score profiles, so the rendered fragment is
+# reused for identical inputs
+_results_fragment = lru_cache(maxsize=FRAGMENT_CACHE_SIZE)(_build_results_fragment)
+
+def create_report_html(scores, feedback, suggestions, responses):
+    """
+    Create HTML content for the email report.
+    
+    Args:
+        scores: Dictionary of strategy scores and dominant strategy
+        feedback: Dictionary of feedback by category
+        suggestions: Dictionary of suggestions
+        responses: Dictionary of user responses
+    
+    Returns:
+        HTML string content for the email
+    """
+    return ''.join(_report_parts(scores, feedback, suggestions))
+
+def create_report_bytes(scores, feedback, suggestions, responses):
+    """
+    Create the email report as UTF-8 bytes, ready to attach to a MIME message.
+    
+    Takes the same arguments as create_report_html.
+    """
+    return create_report_html(scores, feedback, suggestions, responses).encode('utf-8')
 
 def get_strategy_name(code):
     """Convert strategy code to name."""
-    strategy_names = {
-        'G': 'The People‑Pleaser',
-        'B': 'The Diplomat',
-        'C': 'The Challenger',
-        'H': 'The Terminator'
-    }
-    return strategy_names.get(code, code)
+    return REGISTRY.strategy_name(code)